@@ -1,8 +1,19 @@
 from django.contrib import admin
-from .models import Profile, ResumeTemplate, Resume, ResumeSection, Announcement
+from .models import Profile, ResumeTemplate, Resume, ResumeSection, Announcement, ExportJob
 
 admin.site.register(Profile)
 admin.site.register(ResumeTemplate)
-admin.site.register(Resume)
-admin.site.register(ResumeSection)
+
+# __str__ резюме і секцій звертається до пов'язаних об'єктів, тому підтягуємо їх одним запитом
+@admin.register(Resume)
+class ResumeAdmin(admin.ModelAdmin):
+    list_select_related = ('user',)
+
+
+@admin.register(ResumeSection)
+class ResumeSectionAdmin(admin.ModelAdmin):
+    list_select_related = ('resume',)
+
+
 admin.site.register(Announcement)
+admin.site.register(ExportJob)
\ No newline at end of file
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Прогріваємо шрифти reportlab один раз при старті процесу
+        from .fonts import get_font_registry
+        get_font_registry()
@@ -0,0 +1,214 @@
+import io
+import logging
+import multiprocessing
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.test.utils import override_settings
+from django.utils.text import get_valid_filename
+
+from . import metrics
+from .db import close_connection_pools
+from .exports import render_export
+from .models import Resume
+
+logger = logging.getLogger(__name__)
+
+# Команди (одноразовий пул в однопотоковому процесі) успадковують налаштований Django через fork
+_mp_context = multiprocessing.get_context('fork')
+# Веб-процес може бути багатопотоковим, а fork такого процесу небезпечний: спільний пул
+# веб-процесу запускає чисті інтерпретатори, які лише налаштовують Django
+_web_mp_context = multiprocessing.get_context('spawn')
+
+CHUNK_SIZE = 64 * 1024
+
+# Налаштування, від яких залежить, куди і як дочірній процес рендерить документ
+RENDER_SETTINGS = ('EXPORT_CACHE_DIR', 'EXPORT_CACHE_MAX_SIZE', 'PDF_ENGINE', 'MEDIA_ROOT')
+
+_web_pool = None
+_web_pool_lock = threading.Lock()
+# Скільки архівів один веб-процес віддає одночасно; решта запитів отримує 503
+_web_slots = threading.BoundedSemaphore(settings.BATCH_EXPORT_CONCURRENCY)
+
+
+def batch_queryset(user=None, ids=None):
+    # Резюме для пакетного експорту з усім, що потрібно для рендерингу, за фіксовану кількість запитів
+    queryset = Resume.objects.with_related().order_by('pk')
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    return queryset
+
+
+def archive_name(resume, fmt):
+    # Назви резюме можуть повторюватися, тому в імені файлу є id
+    return get_valid_filename(f"{resume.title}-{resume.pk}.{fmt}")
+
+
+def _init_worker():
+    # З'єднання батька не закриваємо (це закрило б його сокет), а лише відв'язуємо:
+    # рендеринг працює з уже завантаженими даними і до БД не звертається
+    for connection in connections.all():
+        connection.connection = None
+
+
+def _prerender(resume, fmt, render_settings=None):
+    # Будує документ у кеші експортів; батьківський процес потім читає його звідти.
+    # Повертає (відбиток, помилка, секунди), метрики рахує батьківський процес
+    start = time.perf_counter()
+    try:
+        with override_settings(**render_settings) if render_settings else nullcontext():
+            fingerprint, fp = render_export(resume, fmt)
+        fp.close()
+        return fingerprint, None, time.perf_counter() - start
+    except Exception as e:
+        logger.exception("Batch export of resume %s failed", resume.pk)
+        return None, repr(e), time.perf_counter() - start
+
+
+# Файлоподібний приймач для ZipFile: записане забирається частинами через drain()
+class _ZipStream(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        # Повертає список з одного фрагмента або порожній, щоб не віддавати клієнту порожні шматки
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return [data] if data else []
+
+
+def _rendered(resumes, fmt, executor):
+    # Трійки (резюме, відбиток, помилка) у порядку resumes, по мірі готовності документів
+    if executor is None or len(resumes) <= 1:
+        results = (_prerender(resume, fmt) for resume in resumes)
+        futures = []
+    else:
+        render_settings = {name: getattr(settings, name) for name in RENDER_SETTINGS}
+        futures = [executor.submit(_prerender, resume, fmt, render_settings) for resume in resumes]
+        results = (future.result() for future in futures)
+    try:
+        for resume, (fingerprint, error, seconds) in zip(resumes, results):
+            metrics.observe('batch_exports.render', seconds)
+            if error is not None:
+                metrics.incr('batch_exports.failed')
+            yield resume, fingerprint, error
+    finally:
+        # Якщо клієнт обірвав завантаження, незапущені задачі скасовуються
+        for future in futures:
+            future.cancel()
+
+
+@contextmanager
+def process_pool(processes):
+    # Одноразовий пул для команд; None означає рендеринг у поточному процесі
+    if processes <= 1:
+        yield None
+        return
+    close_connection_pools()
+    executor = ProcessPoolExecutor(max_workers=processes, mp_context=_mp_context, initializer=_init_worker)
+    try:
+        yield executor
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def web_pool():
+    """
+    Спільний пул процесу для веб-запитів: створюється один раз на воркер і має
+    BATCH_EXPORT_PROCESSES процесів незалежно від кількості запитів. None - рендеринг у потоці запиту.
+    """
+    global _web_pool
+    if settings.BATCH_EXPORT_PROCESSES <= 1:
+        return None
+    with _web_pool_lock:
+        # Пул, дочірній процес якого аварійно завершився, більше не приймає задач
+        if _web_pool is None or _web_pool._broken:
+            _web_pool = ProcessPoolExecutor(
+                max_workers=settings.BATCH_EXPORT_PROCESSES, mp_context=_web_mp_context, initializer=django.setup,
+            )
+        return _web_pool
+
+
+def shutdown_web_pool():
+    global _web_pool
+    with _web_pool_lock:
+        if _web_pool is not None:
+            _web_pool.shutdown(wait=True, cancel_futures=True)
+            _web_pool = None
+
+
+# Ітератор, що звільняє слот веб-процесу, коли сервер закриває відповідь (у тому числі при обриві з'єднання)
+class _SlotIterator:
+    def __init__(self, iterator, release):
+        self._iterator = iterator
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def close(self):
+        self._iterator.close()
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+
+def web_archive(resumes, fmt):
+    """
+    Потік байтів архіву для HTTP-відповіді або None, якщо процес уже віддає
+    BATCH_EXPORT_CONCURRENCY архівів. Документи рендеряться у спільному пулі web_pool().
+    """
+    if not _web_slots.acquire(blocking=False):
+        metrics.incr('batch_exports.rejected')
+        return None
+    try:
+        executor = web_pool()
+    except BaseException:
+        _web_slots.release()
+        raise
+    return _SlotIterator(stream_archive(resumes, fmt, executor), _web_slots.release)
+
+
+def stream_archive(resumes, fmt, executor=None):
+    """
+    Генератор байтів ZIP-архіву з експортами резюме. Документи будуються паралельно
+    в пулі executor (або в поточному процесі), а архів пишеться потоково: у пам'яті лише
+    поточний фрагмент файлу. Резюме, які не вдалося експортувати, перелічуються в errors.txt.
+    """
+    stream = _ZipStream()
+    errors = []
+    # PDF і DOCX вже стиснені, тому файли зберігаються без повторного стиснення
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for resume, fingerprint, error in _rendered(resumes, fmt, executor):
+            if error is not None:
+                errors.append(f"{archive_name(resume, fmt)}: {error}")
+                continue
+            # Документ уже в кеші; якщо його встигли витіснити, render_export збудує його знову
+            with render_export(resume, fmt, fingerprint=fingerprint)[1] as fp:
+                with archive.open(archive_name(resume, fmt), 'w', force_zip64=True) as entry:
+                    while chunk := fp.read(CHUNK_SIZE):
+                        entry.write(chunk)
+                        yield from stream.drain()
+            yield from stream.drain()
+            metrics.incr('batch_exports.files')
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+    yield from stream.drain()
@@ -0,0 +1,337 @@
+import io
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .db import close_connection_pools
+from .models import Resume, ResumeSection, ResumeTemplate
+from .template_gallery import encode_cursor
+
+# Кожен сценарій виконується в окремому процесі, щоб пам'ять одного не впливала на інший
+_mp_context = multiprocessing.get_context('fork')
+
+# Слова для синтетичних секцій: кирилиця перевіряє і шрифти експорту
+WORDS = (
+    'досвід розробка проєкт команда клієнт система сервіс аналіз звіт якість '
+    'python django postgresql api docker linux тестування оптимізація підтримка '
+    'впровадження архітектура інтеграція документація навчання керівництво'
+).split()
+
+# Частка секцій кожної довжини (кількість слів): короткі поля, звичайні описи і довгі, на кілька сторінок
+SECTION_LENGTHS = (
+    ((5, 20), 0.5),
+    ((50, 150), 0.35),
+    ((400, 1200), 0.15),
+)
+
+SYNTHETIC_TEMPLATE = """<style>
+.resume { font-family: sans-serif; color: #222; }
+.resume h2 { color: __COLOR__; border-bottom: 1px solid __COLOR__; }
+</style>
+<div class="resume">
+{% if photo_url %}<img src="{{ photo_url }}" alt="" width="150">{% endif %}
+<h1>{{ resume.title }}</h1>
+{% for section in sections %}
+<h2>{{ section.get_section_type_display }}</h2>
+<p>{{ section.content|linebreaksbr }}</p>
+{% endfor %}
+</div>"""
+
+COLORS = ('#1f4e79', '#7a1f1f', '#2e6b30', '#5b2c83', '#8a5a00', '#333333')
+
+
+def _section_text(rng):
+    (low, high), = rng.choices([lengths for lengths, _ in SECTION_LENGTHS], [weight for _, weight in SECTION_LENGTHS])
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    # Абзаци приблизно по 60 слів
+    return '\n'.join(' '.join(words[i:i + 60]) for i in range(0, len(words), 60))
+
+
+def _photo(rng):
+    # Шум не стискається, тож JPEG має розмір звичайної фотографії; пікселі беруться з rng,
+    # щоб однаковий seed давав однакові файли
+    width, height = rng.randint(800, 1600), rng.randint(800, 1600)
+    image = Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3))
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=85)
+    return output.getvalue()
+
+
+def build_corpus(users=5, resumes_per_user=4, templates=6, photo_ratio=0.5, seed=0):
+    """
+    Створює синтетичних користувачів, шаблони і резюме із секціями різної довжини та фото.
+    Однаковий seed дає однаковий набір даних, тож результати різних запусків можна порівнювати.
+    """
+    rng = random.Random(seed)
+    section_types = [section_type for section_type, _ in ResumeSection.SECTION_TYPES]
+    template_objects = [
+        ResumeTemplate.objects.create(
+            name=f'Шаблон {i}',
+            description=f'Синтетичний шаблон {i}',
+            html_template=SYNTHETIC_TEMPLATE.replace('__COLOR__', COLORS[i % len(COLORS)]),
+        )
+        for i in range(templates)
+    ]
+    stats = {'users': users, 'resumes': 0, 'sections': 0, 'photos': 0, 'templates': templates, 'seed': seed}
+    for i in range(users):
+        user = User.objects.create_user(username=f'bench-{i}')
+        for j in range(resumes_per_user):
+            resume = Resume.objects.create(
+                user=user,
+                title=f'Резюме {i}-{j}',
+                template=rng.choice(template_objects) if template_objects else None,
+            )
+            if rng.random() < photo_ratio:
+                # Збереження фото створює його похідні, як і в застосунку
+                resume.photo.save('photo.jpg', ContentFile(_photo(rng)))
+                stats['photos'] += 1
+            sections = [
+                ResumeSection(resume=resume, section_type=section_types[k % len(section_types)],
+                              content=_section_text(rng), order=k)
+                for k in range(rng.randint(3, 8))
+            ]
+            ResumeSection.objects.bulk_create(sections)
+            stats['resumes'] += 1
+            stats['sections'] += len(sections)
+    return stats
+
+
+def _resume_targets(url_name):
+    # Кожне резюме запитує його власник
+    def targets():
+        return [
+            (resume.user, reverse(url_name, kwargs={'pk': resume.pk}))
+            for resume in Resume.objects.select_related('user').order_by('pk')
+        ]
+    return targets
+
+
+def _gallery_targets():
+    # Усі сторінки галереї за курсорами; курсори рахуються з БД, щоб не прогрівати кеш сторінок
+    page_size = settings.TEMPLATE_GALLERY_PAGE_SIZE
+    templates = list(ResumeTemplate.objects.only('id', 'created_at').order_by('-created_at', '-id'))
+    url = reverse('template_ajax')
+    targets = [(None, url)]
+    for i in range(page_size, len(templates), page_size):
+        targets.append((None, f"{url}?{urlencode({'cursor': encode_cursor(templates[i - 1])})}"))
+    return targets
+
+
+# Сценарій - список (користувач або None, URL), які запитуються по колу
+SCENARIOS = {
+    'export_pdf': _resume_targets('export_pdf'),
+    'export_docx': _resume_targets('export_docx'),
+    'resume_preview': _resume_targets('resume_preview'),
+    'template_ajax': _gallery_targets,
+}
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _percentiles(samples):
+    # Перцентилі за найближчим рангом у мілісекундах
+    if not samples:
+        return None
+    ms = sorted(sample * 1000 for sample in samples)
+
+    def rank(p):
+        return round(ms[min(len(ms) - 1, max(0, math.ceil(p / 100 * len(ms)) - 1))], 2)
+
+    return {
+        'p50': rank(50),
+        'p90': rank(90),
+        'p95': rank(95),
+        'p99': rank(99),
+        'max': round(ms[-1], 2),
+        'mean': round(statistics.fmean(ms), 2),
+    }
+
+
+def run_scenario(name, requests):
+    """
+    Виконує requests запитів сценарію через повний стек Django (middleware, в'ю, відповідь)
+    і повертає перцентилі затримки, пропускну здатність і кількість SQL-запитів.
+    Перший запит кожного URL холодний: експорт, фрагмент прев'ю чи сторінка галереї ще не в кеші.
+    """
+    targets = SCENARIOS[name]()
+    if not targets:
+        return {'scenario': name, 'error': 'No data for scenario'}
+    clients = {}
+    for user, _ in targets:
+        if user not in clients:
+            clients[user] = client = Client(raise_request_exception=False)
+            if user is not None:
+                client.force_login(user)
+
+    counter = _QueryCounter()
+    cold, warm = [], []
+    errors = 0
+    total_bytes = 0
+    start = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        for i in range(requests):
+            user, url = targets[i % len(targets)]
+            request_start = time.perf_counter()
+            response = clients[user].get(url)
+            # Файлові відповіді вичитуються повністю: важливий час до останнього байта
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            response.close()
+            (cold if i < len(targets) else warm).append(time.perf_counter() - request_start)
+            total_bytes += len(body)
+            if response.status_code != 200:
+                errors += 1
+    seconds = time.perf_counter() - start
+    return {
+        'scenario': name,
+        'requests': requests,
+        'urls': len(targets),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'throughput_rps': round(requests / seconds, 2),
+        'latency_ms': _percentiles(cold + warm),
+        'cold_latency_ms': _percentiles(cold),
+        'warm_latency_ms': _percentiles(warm),
+        'mean_bytes': total_bytes // requests,
+        'queries_per_request': round(counter.count / requests, 2),
+    }
+
+
+def _scenario_child(conn, name, requests):
+    try:
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result = run_scenario(name, requests)
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss у Linux вимірюється в КБ. Дочірній процес успадковує пік батьківського,
+        # що будував корпус, тож для порівняння придатний лише приріст під час сценарію
+        result['peak_rss_kb'] = rss_after
+        result['rss_growth_kb'] = rss_after - rss_before
+    except Exception as e:
+        result = {'scenario': name, 'error': repr(e)}
+    conn.send(result)
+    conn.close()
+
+
+def measure_scenario(name, requests):
+    # Дочірній процес відкриває власне з'єднання з БД бенчмарку
+    connections.close_all()
+    close_connection_pools()
+    parent_conn, child_conn = _mp_context.Pipe(duplex=False)
+    process = _mp_context.Process(target=_scenario_child, args=(child_conn, name, requests))
+    process.start()
+    child_conn.close()
+    result = parent_conn.recv()
+    process.join()
+    return result
+
+
+@contextmanager
+def isolated_environment():
+    """
+    Окрема тестова БД і тимчасові каталоги медіа, кешу експортів і прев'ю:
+    синтетичні дані не потрапляють у робочу БД і кеші, а кожен запуск починається з холодного стану.
+    """
+    workdir = tempfile.mkdtemp(prefix='resume-benchmark-')
+    creation = connection.creation
+    if connection.vendor == 'sqlite':
+        # БД у пам'яті не видно з дочірніх процесів, тому тестова БД пишеться у файл
+        connection.settings_dict['TEST']['NAME'] = os.path.join(workdir, 'benchmark.sqlite3')
+    old_name = creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    overrides = override_settings(
+        MEDIA_ROOT=os.path.join(workdir, 'media'),
+        EXPORT_CACHE_DIR=os.path.join(workdir, 'exports'),
+        CACHES={
+            **settings.CACHES,
+            'previews': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.path.join(workdir, 'previews'),
+                'TIMEOUT': None,
+            },
+        },
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+    )
+    try:
+        with overrides:
+            yield workdir
+    finally:
+        connections.close_all()
+        close_connection_pools()
+        creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def environment_info():
+    return {
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'pdf_engine': settings.PDF_ENGINE,
+        'cpu_count': os.cpu_count(),
+    }
+
+
+# Метрики для порівняння запусків: шлях у результаті сценарію і чи краще більше значення
+COMPARED_METRICS = (
+    (('latency_ms', 'p50'), False),
+    (('latency_ms', 'p95'), False),
+    (('cold_latency_ms', 'p50'), False),
+    (('throughput_rps',), True),
+    (('rss_growth_kb',), False),
+    (('queries_per_request',), False),
+)
+
+
+def _metric(result, path):
+    value = result
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Порівнює сценарії двох запусків. Повертає рядки (сценарій, метрика, було, стало, зміна у %, регресія);
+    регресія - погіршення більше ніж на threshold відсотків.
+    """
+    rows = []
+    for name, result in current['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if old is None:
+            continue
+        for path, higher_is_better in COMPARED_METRICS:
+            before, after = _metric(old, path), _metric(result, path)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            regression = (-change if higher_is_better else change) > threshold
+            rows.append((name, '.'.join(path), before, after, round(change, 1), regression))
+    return rows
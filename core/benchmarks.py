@@ -0,0 +1,100 @@
+import io
+import multiprocessing
+import resource
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from django.db import connections
+from django.http import FileResponse, HttpResponse
+from django.test.utils import override_settings
+
+from .db import close_connection_pools
+from .exports import EXPORT_FORMATS, render_export
+
+# Вимірювання запускаються в окремих процесах, щоб пік RSS одного експорту не впливав на інший
+_mp_context = multiprocessing.get_context('fork')
+
+
+# Старий шлях: документ у BytesIO, потім копія getvalue() і ще одна копія у HttpResponse
+def export_via_buffer(resume, sections, fmt):
+    content_type, build = EXPORT_FORMATS[fmt]
+    buffer = io.BytesIO()
+    build(resume, sections, buffer)
+    response = HttpResponse(content_type=content_type)
+    response.write(buffer.getvalue())
+    return len(response.content)
+
+
+# Поточний шлях: документ пишеться у файл кешу і віддається FileResponse частинами
+def export_via_file(resume, sections, fmt):
+    cache_dir = tempfile.mkdtemp()
+    try:
+        with override_settings(EXPORT_CACHE_DIR=cache_dir):
+            fp = render_export(resume, fmt, sections)[1]
+        response = FileResponse(fp, content_type=EXPORT_FORMATS[fmt][0])
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        response.close()
+        return size
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+EXPORT_MODES = {
+    'buffer': export_via_buffer,
+    'file': export_via_file,
+}
+
+
+def _measure_child(conn, mode, resume, sections, fmt, engine, repeat):
+    # Рушій PDF перемикається лише в дочірньому процесі, батьківський не змінюється
+    if engine is not None:
+        override_settings(PDF_ENGINE=engine).enable()
+    try:
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            size = EXPORT_MODES[mode](resume, sections, fmt)
+            timings.append(time.perf_counter() - start)
+        python_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception as e:
+        conn.send({'mode': mode, 'format': fmt, 'engine': engine, 'error': repr(e)})
+        conn.close()
+        return
+    conn.send({
+        'mode': mode,
+        'format': fmt,
+        'engine': engine,
+        'bytes': size,
+        'seconds': timings[0],  # Холодний експорт: шрифти, стилі і шаблон ще не в кеші процесу
+        'warm_seconds': statistics.median(timings[1:]) if repeat > 1 else None,
+        'python_peak_kb': python_peak // 1024,
+        'rss_growth_kb': rss_after - rss_before,  # ru_maxrss у Linux вимірюється в КБ
+        'peak_rss_kb': rss_after,
+    })
+    conn.close()
+
+
+def measure_export_memory(resume, sections, fmt, mode, engine=None, repeat=1):
+    """
+    Виконує експорт repeat разів у дочірньому процесі і повертає його пікове споживання пам'яті,
+    час першого (холодного) і медіану наступних (теплих) експортів.
+    Дочірній процес не звертається до БД: резюме і секції вже завантажені.
+    """
+    connections.close_all()
+    close_connection_pools()
+    parent_conn, child_conn = _mp_context.Pipe(duplex=False)
+    process = _mp_context.Process(
+        target=_measure_child, args=(child_conn, mode, resume, sections, fmt, engine, repeat),
+    )
+    process.start()
+    child_conn.close()
+    result = parent_conn.recv()
+    process.join()
+    return result
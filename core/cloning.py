@@ -0,0 +1,37 @@
+from django.db import transaction
+
+from .models import Resume, ResumeSection
+
+# Максимальна кількість копій за один пакетний запит
+BULK_CLONE_MAX = 100
+
+
+@transaction.atomic
+def clone_resumes(sources, titles=None):
+    """
+    Клонує резюме разом із секціями двома INSERT-запитами незалежно від кількості копій.
+    sources - резюме з попередньо завантаженими секціями (prefetch_related('sections')),
+    одне резюме може повторюватися, щоб отримати кілька копій.
+    """
+    titles = titles or [None] * len(sources)
+    clones = [
+        Resume(
+            user_id=source.user_id,
+            title=(title or f"Copy of {source.title}")[:100],
+            template_id=source.template_id,
+            photo=source.photo.name,
+        )
+        for source, title in zip(sources, titles)
+    ]
+    Resume.objects.bulk_create(clones)
+    ResumeSection.objects.bulk_create([
+        ResumeSection(
+            resume=clone,
+            section_type=section.section_type,
+            content=section.content,
+            order=section.order,
+        )
+        for source, clone in zip(sources, clones)
+        for section in source.sections.all()
+    ])
+    return clones
@@ -0,0 +1,80 @@
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max
+from django.middleware.csrf import get_token
+
+from .models import Resume, ResumeTemplate
+from .template_gallery import gallery_version
+
+# Валідатори для django.views.decorators.http.condition. Рахуються з часових міток
+# одним легким запитом values_list/aggregate, без завантаження рядків і серіалізації.
+# condition викликає etag_func і last_modified_func окремо, тому результат запиту
+# запам'ятовується на об'єкті запиту.
+
+
+def _etag(*parts):
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _memoize(request, attr, compute):
+    if not hasattr(request, attr):
+        setattr(request, attr, compute())
+    return getattr(request, attr)
+
+
+def _resume_row(request, pk, owner=None):
+    def compute():
+        queryset = Resume.objects.filter(pk=pk)
+        if owner is not None:
+            queryset = queryset.filter(user=owner)
+        return queryset.values_list('updated_at', 'template__updated_at').first()
+    return _memoize(request, '_resume_validators', compute)
+
+
+# Той самий ресурс у JSON і в browsable API DRF - різні представлення
+def _variant(request):
+    return request.GET.urlencode(), request.META.get('HTTP_ACCEPT', '')
+
+
+def _latest(row):
+    return max(timestamp for timestamp in row if timestamp is not None)
+
+
+# Резюме в API: зміна секцій оновлює updated_at резюме (див. signals), шаблон має власний updated_at
+def resume_etag(request, pk, *args, **kwargs):
+    row = _resume_row(request, pk)
+    return _etag('resume', pk, *row, *_variant(request)) if row else None
+
+
+def resume_last_modified(request, pk, *args, **kwargs):
+    row = _resume_row(request, pk)
+    return _latest(row) if row else None
+
+
+# Сторінка прев'ю показує лише власні резюме і рендериться з base.html: ім'я користувача,
+# CSRF-токен форми виходу і флеш-повідомлення. Тому ETag враховує секрет CSRF сесії, а поки є
+# непоказані повідомлення, сторінка віддається повністю. Last-Modified не надсилається:
+# If-Modified-Since не розрізнив би ці стани сесії
+def resume_preview_etag(request, pk, *args, **kwargs):
+    if len(get_messages(request)):  # len() не позначає повідомлення показаними
+        return None
+    row = _resume_row(request, pk, owner=request.user)
+    if not row:
+        return None
+    get_token(request)  # Створює секрет CSRF, якщо його ще немає
+    return _etag('preview', pk, request.user.pk, *row, request.META['CSRF_COOKIE'])
+
+
+# Для списку шаблонів Last-Modified не підходить: видалення шаблону не збільшує максимум updated_at,
+# тому ETag враховує ще й кількість шаблонів і параметри запиту (сторінка, фільтри, поля)
+def template_list_etag(request, *args, **kwargs):
+    def compute():
+        return ResumeTemplate.objects.aggregate(latest=Max('updated_at'), count=Count('id'))
+    stats = _memoize(request, '_template_list_validators', compute)
+    return _etag('templates', stats['latest'], stats['count'], *_variant(request))
+
+
+# Галерея шаблонів має власну версію в кеші, тож її ETag не потребує запиту до БД
+def template_gallery_etag(request, *args, **kwargs):
+    return _etag('gallery', gallery_version(), *_variant(request))
@@ -0,0 +1,33 @@
+from django.db import connections
+
+
+def _open_pool(connection):
+    # Властивість connection.pool створює пул при першому зверненні, тут потрібні лише вже відкриті
+    return getattr(connection, '_connection_pools', {}).get(connection.alias)
+
+
+def close_connection_pools():
+    """
+    Закриває відкриті пули з'єднань psycopg. Викликається перед fork:
+    потоки пулу не переживають fork, тож дочірні процеси відкривають власні пули.
+    """
+    for connection in connections.all():
+        if _open_pool(connection) is not None:
+            connection.close_pool()
+
+
+def connection_stats():
+    # Налаштування і стан з'єднань поточного процесу; статистика пулу - з psycopg_pool.get_stats()
+    stats = {}
+    for connection in connections.all():
+        settings_dict = connection.settings_dict
+        pool = _open_pool(connection)
+        stats[connection.alias] = {
+            'vendor': connection.vendor,
+            'conn_max_age': settings_dict['CONN_MAX_AGE'],
+            'conn_health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+            'pooled': bool(settings_dict['OPTIONS'].get('pool')),
+            'connected': connection.connection is not None,
+            'pool': pool.get_stats() if pool is not None else None,
+        }
+    return stats
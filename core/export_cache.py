@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_evict_lock = threading.Lock()
+
+# Розмір кешу, відомий процесу: каталог -> [байти, час останнього сканування].
+# Повне сканування потрібне лише при перевищенні ліміту або раз на RESCAN_INTERVAL секунд,
+# бо файли в той самий каталог пишуть і інші процеси
+_sizes = {}
+RESCAN_INTERVAL = 300
+# Витіснення звільняє запас до цієї частки max_size, щоб повний кеш не сканувався при кожному записі
+EVICT_TO = 0.9
+
+# Змінюється при зміні верстки експорту, щоб старі файли не віддавались
+EXPORT_LAYOUT_VERSION = '3'
+
+
+def export_fingerprint(resume, sections, fmt):
+    """
+    Рахує відбиток експорту: рядок резюме, його секції, файл фото і шаблон.
+    Однаковий відбиток означає байт-в-байт однаковий документ.
+    """
+    digest = hashlib.sha256()
+
+    def feed(*values):
+        for value in values:
+            digest.update(str(value).encode('utf-8'))
+            digest.update(b'\x00')
+
+    feed(EXPORT_LAYOUT_VERSION, fmt, resume.pk, resume.title, resume.updated_at.isoformat())
+    if fmt == 'pdf':
+        feed(settings.PDF_ENGINE)  # Зміна рушія PDF дає інший документ
+    for section in sections:
+        feed(section.pk, section.section_type, section.order, section.content)
+    if resume.photo:
+        try:
+            stat = os.stat(resume.photo.path)
+            feed(resume.photo.name, stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            feed(resume.photo.name, 'missing')
+    template = resume.template
+    if template is not None:
+        feed(template.pk, hashlib.sha256(template.html_template.encode('utf-8')).hexdigest())
+    return digest.hexdigest()
+
+
+# Обмежений за розміром LRU-кеш готових експортів у локальній файловій системі
+class ExportCache:
+    def __init__(self, directory, max_size):
+        self.directory = str(directory)
+        self.max_size = max_size
+
+    # Кожне резюме має власний підкаталог, щоб інвалідація не сканувала весь кеш
+    def _resume_dir(self, resume_pk):
+        return os.path.join(self.directory, str(resume_pk))
+
+    def _filename(self, resume_pk, fingerprint, fmt):
+        return os.path.join(self._resume_dir(resume_pk), f"{fingerprint}.{fmt}")
+
+    def open(self, resume_pk, fingerprint, fmt):
+        """
+        Повертає відкритий файл із кешу або None. Оновлює mtime,
+        який використовується як час останнього доступу для LRU.
+        """
+        path = self._filename(resume_pk, fingerprint, fmt)
+        try:
+            fp = open(path, 'rb')
+        except FileNotFoundError:
+            metrics.incr('export_cache.miss')
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        metrics.incr('export_cache.hit')
+        return fp
+
+    def store(self, resume_pk, fingerprint, fmt, build):
+        """
+        Викликає build(fp) для запису документа у тимчасовий файл,
+        атомарно переносить його в кеш і повертає файл, відкритий на читання.
+        """
+        resume_dir = self._resume_dir(resume_pk)
+        os.makedirs(resume_dir, exist_ok=True)
+        path = self._filename(resume_pk, fingerprint, fmt)
+        fd, tmp_path = tempfile.mkstemp(dir=resume_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                build(tmp)
+            fp = open(tmp_path, 'rb')
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._added(os.fstat(fp.fileno()).st_size, keep=path)
+        return fp
+
+    def invalidate(self, resume_pk):
+        # Видаляє всі експорти конкретного резюме
+        removed = 0
+        for entry in self._entries(self._resume_dir(resume_pk)):
+            try:
+                removed += entry.stat().st_size
+            except FileNotFoundError:
+                continue
+            self._remove(entry.path)
+        with _evict_lock:
+            state = _sizes.get(self.directory)
+            if state is not None:
+                state[0] = max(0, state[0] - removed)
+
+    def _added(self, size, keep):
+        # Дописує новий файл до відомого розміру; весь кеш сканується лише коли цього не уникнути
+        with _evict_lock:
+            state = _sizes.get(self.directory)
+            if (state is not None and state[0] + size <= self.max_size
+                    and time.monotonic() - state[1] < RESCAN_INTERVAL):
+                state[0] += size
+                metrics.gauge('export_cache.size', state[0])
+                return
+        self.evict(keep=keep)
+
+    def evict(self, keep=None):
+        # Сканує кеш і, якщо він більший за max_size, видаляє найдавніше використані файли до EVICT_TO
+        with _evict_lock:
+            entries = []
+            total = 0
+            for entry in self._all_entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            entries.sort()
+            target = self.max_size * EVICT_TO if total > self.max_size else total
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                if path == keep:
+                    continue
+                self._remove(path)
+                metrics.incr('export_cache.evicted')
+                total -= size
+            _sizes[self.directory] = [total, time.monotonic()]
+            metrics.gauge('export_cache.size', total)
+
+    def _entries(self, directory):
+        try:
+            with os.scandir(directory) as it:
+                return [entry for entry in it if entry.is_file() and not entry.name.endswith('.tmp')]
+        except FileNotFoundError:
+            return []
+
+    def _all_entries(self):
+        try:
+            with os.scandir(self.directory) as it:
+                resume_dirs = [entry.path for entry in it if entry.is_dir()]
+        except FileNotFoundError:
+            return []
+        return [entry for resume_dir in resume_dirs for entry in self._entries(resume_dir)]
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def get_export_cache():
+    return ExportCache(settings.EXPORT_CACHE_DIR, settings.EXPORT_CACHE_MAX_SIZE)
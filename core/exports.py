@@ -0,0 +1,140 @@
+import logging
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from docx import Document
+from docx.shared import Cm
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer
+
+from . import metrics
+from .export_cache import export_fingerprint, get_export_cache
+from .fonts import get_font_registry
+from .html_exports import build_html_pdf
+from .photos import derivative_path
+
+logger = logging.getLogger(__name__)
+
+PDF_CONTENT_TYPE = 'application/pdf'
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+
+# Будує PDF-версію резюме у файлоподібний об'єкт out.
+# Верстку виконує platypus: довгі секції переносяться на наступні сторінки автоматично
+def build_pdf(resume, sections, out):
+    # Шрифти і стилі завантажуються один раз на процес (див. CoreConfig.ready)
+    styles = get_font_registry().styles
+    doc = SimpleDocTemplate(
+        out,
+        pagesize=A4,
+        leftMargin=2 * cm,
+        rightMargin=2 * cm,
+        topMargin=2 * cm,
+        bottomMargin=2 * cm,
+        title=resume.title,
+    )
+    story = []
+
+    # Додаємо фотографію (вгорі)
+    if resume.photo:
+        try:
+            photo_path = derivative_path(resume.photo, 'export')
+            ImageReader(photo_path).getSize()  # Перевіряємо, що файл читається, до початку верстки
+            photo = Image(photo_path, width=5 * cm, height=5 * cm, kind='proportional')
+            photo.hAlign = 'LEFT'
+            story += [photo, Spacer(1, 1 * cm)]
+        except Exception as e:
+            logger.warning("Error rendering image: %s", e)
+            story.append(Paragraph("Не вдалося завантажити фотографію", styles['section_body']))
+
+    # Заголовок резюме
+    story.append(Paragraph(escape(resume.title[:100]), styles['title']))  # Обмежуємо довжину заголовка
+
+    # Секції резюме
+    for section in sections:
+        # Заголовок секції (жирний шрифт), не відривається від першого рядка вмісту
+        story.append(Paragraph(escape(f"{section.get_section_type_display()}:"), styles['section_title']))
+        # Вміст секції
+        content = section.content or ""
+        if content:
+            story.append(Paragraph(escape(content).replace('\n', '<br/>'), styles['section_body']))
+        story.append(Spacer(1, 1 * cm))  # Додатковий відступ
+
+    doc.build(story)
+
+
+# Будує DOCX-версію резюме у файлоподібний об'єкт out
+def build_docx(resume, sections, out):
+    doc = Document()
+
+    # Додаємо фотографію (вгорі)
+    if resume.photo:
+        try:
+            paragraph = doc.add_paragraph()
+            run = paragraph.add_run()
+            run.add_picture(derivative_path(resume.photo, 'export'), width=Cm(5), height=Cm(5))
+            paragraph.paragraph_format.space_after = Cm(0.5)
+        except Exception as e:
+            logger.warning("Error adding image to DOCX: %s", e)
+            doc.add_paragraph("Не вдалося завантажити фотографію")
+
+    # Заголовок резюме
+    doc.add_heading(resume.title[:100], 0)
+
+    # Секції резюме
+    for section in sections:
+        # Налаштування стилю для жирного заголовка секції
+        heading = doc.add_heading(level=1)
+        run = heading.add_run(f"{section.get_section_type_display()}:")
+        run.bold = True
+        # Опція підкреслення
+        # run.underline = True
+        # Вміст секції
+        doc.add_paragraph(section.content or "")
+
+    doc.save(out)
+
+
+# Рушії PDF: фіксована верстка reportlab або html_template резюме через WeasyPrint
+PDF_ENGINES = {
+    'reportlab': build_pdf,
+    'weasyprint': build_html_pdf,
+}
+
+
+def pdf_engine_for(resume):
+    # HTML-рушію потрібен шаблон; резюме без шаблону експортується версткою reportlab
+    if settings.PDF_ENGINE == 'weasyprint' and resume.template is not None:
+        return 'weasyprint'
+    return 'reportlab'
+
+
+def build_pdf_export(resume, sections, out):
+    PDF_ENGINES[pdf_engine_for(resume)](resume, sections, out)
+
+
+# Підтримувані формати експорту: MIME-тип і функція побудови
+EXPORT_FORMATS = {
+    'pdf': (PDF_CONTENT_TYPE, build_pdf_export),
+    'docx': (DOCX_CONTENT_TYPE, build_docx),
+}
+
+
+def render_export(resume, fmt, sections=None, fingerprint=None):
+    """
+    Повертає (відбиток, відкритий файл документа). Документ береться з кешу
+    експортів або будується один раз і кладеться туди.
+    """
+    if sections is None:
+        sections = list(resume.sections.all())
+    build = EXPORT_FORMATS[fmt][1]
+    if fingerprint is None:
+        fingerprint = export_fingerprint(resume, sections, fmt)
+    cache = get_export_cache()
+    fp = cache.open(resume.pk, fingerprint, fmt)
+    if fp is None:
+        with metrics.timer(f'exports.render.{fmt}'):
+            fp = cache.store(resume.pk, fingerprint, fmt, lambda out: build(resume, sections, out))
+    return fingerprint, fp
@@ -0,0 +1,93 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+FONT_NAME = 'DejaVuSans'
+FONT_BOLD_NAME = 'DejaVuSans-Bold'
+FALLBACK_FONT_NAME = 'Helvetica'
+FALLBACK_FONT_BOLD_NAME = 'Helvetica-Bold'
+
+
+# Реєстр шрифтів і стилів reportlab, спільний для всіх запитів процесу
+class FontRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.font_name = FALLBACK_FONT_NAME
+        self.font_bold_name = FALLBACK_FONT_BOLD_NAME
+        self.styles = {}
+
+    def load(self):
+        """
+        Один раз на процес парсить TTF-файли DejaVuSans і будує стилі Paragraph.
+        Якщо шрифти недоступні, переходить на Helvetica і фіксує це в метриках.
+        """
+        if self._loaded:
+            return self
+        with self._lock:
+            if self._loaded:
+                return self
+            start = time.perf_counter()
+            fonts_dir = os.path.join(settings.BASE_DIR, 'static', 'fonts')
+            try:
+                if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+                    pdfmetrics.registerFont(TTFont(FONT_NAME, os.path.join(fonts_dir, 'DejaVuSans.ttf')))
+                    pdfmetrics.registerFont(TTFont(FONT_BOLD_NAME, os.path.join(fonts_dir, 'DejaVuSans-Bold.ttf')))
+                self.font_name = FONT_NAME
+                self.font_bold_name = FONT_BOLD_NAME
+            except Exception as e:
+                logger.warning("Error loading font, falling back to Helvetica: %s", e)
+                metrics.incr('fonts.fallback')
+                self.font_name = FALLBACK_FONT_NAME
+                self.font_bold_name = FALLBACK_FONT_BOLD_NAME
+            self.styles = self._build_styles()
+            metrics.observe('fonts.load', time.perf_counter() - start)
+            self._loaded = True
+        return self
+
+    def _build_styles(self):
+        return {
+            'title': ParagraphStyle(
+                name='Title',
+                fontName=self.font_bold_name,
+                fontSize=16,
+                leading=20,
+                spaceAfter=1 * cm,
+            ),
+            'section_title': ParagraphStyle(
+                name='SectionTitle',
+                fontName=self.font_bold_name,
+                fontSize=12,
+                leading=14,
+                spaceAfter=0.3 * cm,
+                keepWithNext=1,  # Заголовок секції не залишається сам унизу сторінки
+            ),
+            'section_body': ParagraphStyle(
+                name='Normal',
+                fontName=self.font_name,
+                fontSize=12,
+                leading=14,  # Міжрядковий інтервал
+                leftIndent=3 * cm,  # Відступ зліва
+                spaceAfter=0.5 * cm,  # Відступ після абзацу
+                allowWidows=1,
+                allowOrphans=1,
+            ),
+        }
+
+
+font_registry = FontRegistry()
+
+
+def get_font_registry():
+    return font_registry.load()
@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
-from django.forms import inlineformset_factory
-from .models import Profile, Resume, ResumeSection, Announcement
+from django.forms import BaseInlineFormSet, inlineformset_factory
+from .models import Profile, Resume, ResumeSection, ResumeTemplate, Announcement
 
 class RegistrationForm(forms.ModelForm):
     password = forms.CharField(widget=forms.PasswordInput, label="Пароль")
@@ -58,6 +58,11 @@ class ResumeForm(forms.ModelForm):
             'photo': forms.FileInput(attrs={'class': 'form-control-file'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Випадаючий список показує лише назви шаблонів
+        self.fields['template'].queryset = ResumeTemplate.objects.summary()
+
 class ResumeSectionForm(forms.ModelForm):
     class Meta:
         model = ResumeSection
@@ -92,10 +97,24 @@ class ResumeSectionForm(forms.ModelForm):
 # Список фіксованих типів секцій
 SECTION_TYPES = ['personal', 'experience', 'education', 'skills', 'other']
 
+
+# Унікальність порядку секцій перевіряє formset за UniqueConstraint(resume, order) моделі
+class BaseSectionFormSet(BaseInlineFormSet):
+    def get_unique_error_message(self, unique_check):
+        if set(unique_check) == {'resume', 'order'}:
+            return "Порядок секцій має бути унікальним."
+        return super().get_unique_error_message(unique_check)
+
+    # Помилка форми з повторним порядком (інших обмежень унікальності секції не мають)
+    def get_form_error(self):
+        return "Порядок секцій має бути унікальним."
+
+
 SectionFormSet = inlineformset_factory(
     Resume,
     ResumeSection,
     form=ResumeSectionForm,
+    formset=BaseSectionFormSet,
     fields=['section_type', 'content', 'order'],
     extra=0,  # Не додаємо зайвих форм
     can_delete=False
@@ -118,6 +137,7 @@ def get_section_formset(resume=None, data=None, files=None):
             Resume,
             ResumeSection,
             form=ResumeSectionForm,
+            formset=BaseSectionFormSet,
             fields=['section_type', 'content', 'order'],
             extra=len(initial_data),
             can_delete=False
@@ -143,7 +163,9 @@ def get_section_formset(resume=None, data=None, files=None):
         if existing_sections.exists():
             section_types_map = {s.section_type: s for s in existing_sections}
             missing_types = [t for t in SECTION_TYPES if t not in section_types_map]
-            for i, sec_type in enumerate(missing_types, start=len(existing_sections)):
+            # Нові секції йдуть після наявних, не займаючи їхній порядок
+            next_order = max(s.order for s in existing_sections) + 1
+            for i, sec_type in enumerate(missing_types, start=next_order):
                 ResumeSection.objects.create(
                     resume=resume,
                     section_type=sec_type,
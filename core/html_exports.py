@@ -0,0 +1,146 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.template import engines
+
+from . import metrics
+from .photos import TemplateResume
+
+# WeasyPrint імпортується лише під час рендерингу: йому потрібні системні бібліотеки Pango,
+# яких може не бути на машині, що не експортує PDF через HTML
+
+_STYLE_RE = re.compile(r'<style[^>]*>(.*?)</style>', re.IGNORECASE | re.DOTALL)
+
+# Базова сторінка і шрифт із кирилицею; стилі шаблону підключаються після неї і можуть її перевизначити
+BASE_CSS = """
+@page {{ size: A4; margin: 2cm; }}
+@font-face {{ font-family: 'DejaVu Sans'; src: url('{regular}'); }}
+@font-face {{ font-family: 'DejaVu Sans'; font-weight: bold; src: url('{bold}'); }}
+body {{ font-family: 'DejaVu Sans', sans-serif; }}
+"""
+
+PdfAssets = namedtuple('PdfAssets', ['font_config', 'stylesheets', 'body'])
+
+
+def weasyprint_available():
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def split_styles(html):
+    """
+    Виносить статичні блоки <style> з тексту шаблону, щоб розібрати CSS один раз.
+    Блоки з тегами шаблонізатора залишаються в HTML і розбираються при кожному рендерингу.
+    """
+    styles = []
+
+    def extract(match):
+        css = match.group(1)
+        if '{{' in css or '{%' in css:
+            return match.group(0)
+        styles.append(css)
+        return ''
+
+    return _STYLE_RE.sub(extract, html), styles
+
+
+def _allowed_roots():
+    return [Path(settings.MEDIA_ROOT).resolve(), (Path(settings.BASE_DIR) / 'static').resolve()]
+
+
+def url_fetcher(url, *args, **kwargs):
+    # Шаблон може посилатися лише на файли медіа і статики, а не на довільні файли чи мережу
+    parsed = urlparse(url)
+    if parsed.scheme != 'file':
+        raise ValueError(f"Resource is not allowed in PDF export: {url}")
+    path = Path(unquote(parsed.path)).resolve()
+    if not any(path.is_relative_to(root) for root in _allowed_roots()):
+        raise ValueError(f"Resource is not allowed in PDF export: {url}")
+    from weasyprint.urls import default_url_fetcher
+    return default_url_fetcher(url, *args, **kwargs)
+
+
+def _build_assets(template):
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    static_dir = Path(settings.BASE_DIR) / 'static'
+    fonts_dir = static_dir / 'fonts'
+    body, styles = split_styles(template.html_template)
+    font_config = FontConfiguration()
+    base_css = BASE_CSS.format(
+        regular=(fonts_dir / 'DejaVuSans.ttf').as_uri(),
+        bold=(fonts_dir / 'DejaVuSans-Bold.ttf').as_uri(),
+    )
+    stylesheets = [
+        CSS(string=css, font_config=font_config, url_fetcher=url_fetcher, base_url=static_dir.as_uri() + '/')
+        for css in [base_css] + styles
+    ]
+    return PdfAssets(font_config, stylesheets, engines['django'].from_string(body))
+
+
+# LRU-кеш розібраних стилів і конфігурації шрифтів WeasyPrint для шаблонів резюме в межах процесу
+class PdfAssetCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template):
+        """
+        Повертає PdfAssets шаблону. Розбір CSS і завантаження шрифтів - найдорожча частина
+        холодного рендерингу WeasyPrint, тож вони виконуються один раз на версію шаблону.
+        """
+        key = (template.pk, hashlib.sha1(template.html_template.encode('utf-8')).hexdigest())
+        with self._lock:
+            assets = self._entries.get(key)
+            if assets is not None:
+                self._entries.move_to_end(key)
+                metrics.incr('pdf_assets.hit')
+                return assets
+
+        metrics.incr('pdf_assets.miss')
+        with metrics.timer('pdf_assets.build'):
+            assets = _build_assets(template)
+        with self._lock:
+            self._entries[key] = assets
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return assets
+
+    def invalidate(self, template_pk):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == template_pk]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+pdf_assets = PdfAssetCache(settings.PDF_ASSET_CACHE_SIZE)
+
+
+# Будує PDF з html_template резюме, тобто з тією ж версткою, що і прев'ю
+def build_html_pdf(resume, sections, out):
+    from weasyprint import HTML
+
+    assets = pdf_assets.get(resume.template)
+    template_resume = TemplateResume(resume, 'export', as_file=True)
+    photo_url = template_resume.photo.url if resume.photo else None
+    html = assets.body.render({'resume': template_resume, 'sections': sections, 'photo_url': photo_url})
+    document = HTML(
+        string=html,
+        base_url=Path(settings.MEDIA_ROOT).resolve().as_uri() + '/',
+        url_fetcher=url_fetcher,
+    )
+    document.write_pdf(out, stylesheets=assets.stylesheets, font_config=assets.font_config)
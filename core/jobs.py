@@ -0,0 +1,162 @@
+import logging
+import multiprocessing
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections, transaction
+from django.utils import timezone
+
+from . import metrics
+from .db import close_connection_pools
+from .exports import render_export
+from .models import ExportJob, Resume
+
+logger = logging.getLogger(__name__)
+
+# Воркери успадковують налаштований Django через fork
+_mp_context = multiprocessing.get_context('fork')
+
+
+def enqueue_export(resume, fmt):
+    """
+    Ставить експорт у чергу. Якщо для резюме вже є задача того ж формату,
+    що очікує виконання, повертає її замість створення дубліката.
+    """
+    with transaction.atomic():
+        # Як і в schedule_prerender, блокування рядка резюме не дає паралельним запитам створити дублікати
+        list(Resume.objects.select_for_update().filter(pk=resume.pk).values_list('pk', flat=True))
+        job = ExportJob.objects.filter(resume=resume, format=fmt, status=ExportJob.STATUS_PENDING).first()
+        if job is None:
+            job = ExportJob.objects.create(resume=resume, format=fmt)
+            metrics.incr('export_jobs.enqueued')
+        elif job.run_after > timezone.now():
+            # Відкладений попередній рендеринг потрібен користувачу зараз
+            job.run_after = timezone.now()
+            job.save(update_fields=['run_after'])
+    return job
+
+
+def schedule_prerender(resume, formats=('pdf', 'docx'), delay=None):
+    """
+    Планує попередній рендеринг експортів після збереження резюме, щоб завантаження
+    віддавало готовий файл з кешу. Серія збережень зливається в один рендеринг:
+    ще не настала задача щоразу відкладається на delay секунд від останнього збереження,
+    але не далі ніж на EXPORT_PRERENDER_MAX_WAIT секунд від її створення.
+    """
+    if delay is None:
+        delay = settings.EXPORT_PRERENDER_DELAY
+    max_wait = timedelta(seconds=settings.EXPORT_PRERENDER_MAX_WAIT)
+    with transaction.atomic():
+        # Блокування рядка резюме серіалізує паралельні збереження: інакше обидва
+        # не побачили б задачі, що очікує, і створили б дублікати
+        list(Resume.objects.select_for_update().filter(pk=resume.pk).values_list('pk', flat=True))
+        now = timezone.now()
+        run_after = now + timedelta(seconds=delay)
+        pending = {job.format: job for job in ExportJob.objects.filter(resume=resume, status=ExportJob.STATUS_PENDING)}
+        postponed = []
+        new_jobs = []
+        for fmt in formats:
+            job = pending.get(fmt)
+            if job is None:
+                new_jobs.append(ExportJob(resume=resume, format=fmt, run_after=run_after))
+            elif job.run_after > now:
+                # Користувач, що редагує безперервно, все одно отримає рендеринг через max_wait
+                job.run_after = min(job.created_at + max_wait, run_after)
+                postponed.append(job)
+            # Задача, що вже настала, виконається найближчим часом і прочитає свіжі дані резюме
+        if postponed:
+            ExportJob.objects.bulk_update(postponed, ['run_after'])
+            metrics.incr('export_jobs.debounced', len(postponed))
+        if new_jobs:
+            ExportJob.objects.bulk_create(new_jobs)
+            metrics.incr('export_jobs.enqueued', len(new_jobs))
+
+
+# Повертає в чергу задачі, воркер яких завершився аварійно
+def requeue_stale_jobs():
+    deadline = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+    return ExportJob.objects.filter(
+        status=ExportJob.STATUS_RUNNING, started_at__lt=deadline
+    ).update(status=ExportJob.STATUS_PENDING, started_at=None)
+
+
+def claim_next_job():
+    """
+    Атомарно забирає задачу з черги, час якої настав, у порядку run_after.
+    SKIP LOCKED дозволяє кільком воркерам читати чергу без блокування один одного.
+    """
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ExportJob.STATUS_PENDING, run_after__lte=timezone.now())
+            .order_by('run_after', 'pk')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ExportJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def run_job(job):
+    try:
+        resume = Resume.objects.with_related().get(pk=job.resume_id)
+        with metrics.timer(f'export_jobs.render.{job.format}'):
+            job.fingerprint, fp = render_export(resume, job.format)
+        fp.close()
+        job.status = ExportJob.STATUS_DONE
+        job.error = ''
+    except Exception as e:
+        logger.exception("Export job %s failed", job.pk)
+        metrics.incr('export_jobs.failed')
+        job.status = ExportJob.STATUS_FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'fingerprint', 'error', 'finished_at'])
+    return job
+
+
+def run_pending(limit=None):
+    # Виконує задачі з черги в поточному процесі, повертає кількість виконаних
+    done = 0
+    while limit is None or done < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        done += 1
+    return done
+
+
+def worker_loop(poll_interval):
+    # Після fork з'єднання батьківського процесу використовувати не можна
+    connections.close_all()
+    while True:
+        close_old_connections()
+        try:
+            requeue_stale_jobs()
+            processed = run_pending(limit=1)
+        except DatabaseError:
+            logger.exception("Export worker lost access to the queue")
+            processed = 0
+        if not processed:
+            time.sleep(poll_interval)
+
+
+def start_worker_pool(processes, poll_interval):
+    """
+    Запускає пул процесів-воркерів, що обробляють чергу ExportJob.
+    Експорт виконується поза воркерами gunicorn, тож інтерактивні запити не чекають.
+    """
+    connections.close_all()
+    close_connection_pools()
+    workers = [
+        _mp_context.Process(target=worker_loop, args=(poll_interval,), name=f'export-worker-{i}', daemon=True)
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
@@ -0,0 +1,64 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import EXPORT_MODES, measure_export_memory
+from core.exports import EXPORT_FORMATS, PDF_ENGINES
+from core.html_exports import weasyprint_available
+from core.models import Resume
+
+
+class Command(BaseCommand):
+    help = 'Measure time and peak memory per export for each export path and PDF engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resume_ids', nargs='+', type=int, help='Resumes to export')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), action='append', dest='formats',
+                            help='Export format (repeatable, default: all)')
+        parser.add_argument('--mode', choices=sorted(EXPORT_MODES), action='append', dest='modes',
+                            help='Export path to measure (repeatable, default: all)')
+        parser.add_argument('--engine', choices=sorted(PDF_ENGINES), action='append', dest='engines',
+                            help='PDF engine to measure (repeatable, default: PDF_ENGINE setting)')
+        parser.add_argument('--repeat', type=int, default=1,
+                            help='Exports per measurement; the first is cold, the rest are reported as warm')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        formats = options['formats'] or sorted(EXPORT_FORMATS)
+        modes = options['modes'] or sorted(EXPORT_MODES)
+        engines = options['engines'] or [settings.PDF_ENGINE]
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+        if 'weasyprint' in engines and 'pdf' in formats and not weasyprint_available():
+            raise CommandError('WeasyPrint is not installed or its system libraries (Pango) are missing')
+        resumes = list(Resume.objects.with_related().filter(pk__in=options['resume_ids']))
+        if not resumes:
+            raise CommandError('No resumes found')
+
+        results = []
+        for resume in resumes:
+            sections = list(resume.sections.all())
+            for fmt in formats:
+                # Рушій впливає лише на PDF
+                for engine in (engines if fmt == 'pdf' else [None]):
+                    for mode in modes:
+                        result = measure_export_memory(resume, sections, fmt, mode, engine, options['repeat'])
+                        result['resume'] = resume.pk
+                        results.append(result)
+                        if not options['json']:
+                            self.stdout.write(self.format_result(result))
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+
+    def format_result(self, result):
+        line = f"resume={result['resume']} format={result['format']:<4} engine={result['engine'] or '-':<10} mode={result['mode']:<6} "
+        if 'error' in result:
+            return line + f"error={result['error']}"
+        line += (
+            f"size={result['bytes'] // 1024} KB time={result['seconds'] * 1000:.1f} ms "
+            f"python_peak={result['python_peak_kb']} KB rss_growth={result['rss_growth_kb']} KB"
+        )
+        if result['warm_seconds'] is not None:
+            line += f" warm_time={result['warm_seconds'] * 1000:.1f} ms"
+        return line
@@ -0,0 +1,89 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark_suite import (
+    SCENARIOS, build_corpus, compare_results, environment_info, isolated_environment, measure_scenario,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark exports, resume preview and template gallery on a synthetic corpus in a separate database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append', dest='scenarios',
+                            help='Scenario to run (repeatable, default: all)')
+        parser.add_argument('--requests', type=int, default=100, help='Requests per scenario')
+        parser.add_argument('--users', type=int, default=5, help='Synthetic users')
+        parser.add_argument('--resumes', type=int, default=4, help='Resumes per user')
+        parser.add_argument('--templates', type=int, default=12, help='Resume templates')
+        parser.add_argument('--photo-ratio', type=float, default=0.5, help='Share of resumes with a photo')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic corpus')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+        parser.add_argument('--compare', metavar='BASELINE', help='JSON results of an earlier run to compare with')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Percent change of a metric reported as a regression')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error if any metric regressed')
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'] or sorted(SCENARIOS)
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline {options["compare"]}: {e}')
+
+        with isolated_environment():
+            corpus = build_corpus(
+                users=options['users'],
+                resumes_per_user=options['resumes'],
+                templates=options['templates'],
+                photo_ratio=options['photo_ratio'],
+                seed=options['seed'],
+            )
+            results = {**environment_info(), 'corpus': corpus, 'scenarios': {}}
+            for name in scenarios:
+                result = measure_scenario(name, options['requests'])
+                results['scenarios'][name] = result
+                if not options['json']:
+                    self.stdout.write(self.format_result(result))
+
+        rows = []
+        if baseline is not None:
+            rows = compare_results(baseline, results, options['threshold'])
+            results['comparison'] = [
+                dict(zip(('scenario', 'metric', 'baseline', 'current', 'change_percent', 'regression'), row))
+                for row in rows
+            ]
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            for name, metric, before, after, change, regression in rows:
+                marker = 'REGRESSION' if regression else ''
+                self.stdout.write(f"{name:<15} {metric:<22} {before:>10} -> {after:<10} {change:+.1f}% {marker}")
+
+        regressions = [f'{name} {metric}' for name, metric, *_, regression in rows if regression]
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'Performance regressions: {", ".join(regressions)}')
+
+    def format_result(self, result):
+        line = f"{result['scenario']:<15} "
+        if 'error' in result:
+            return line + f"error={result['error']}"
+        latency = result['latency_ms']
+        line += (
+            f"requests={result['requests']} errors={result['errors']} rps={result['throughput_rps']} "
+            f"p50={latency['p50']} ms p95={latency['p95']} ms p99={latency['p99']} ms "
+            f"cold_p50={result['cold_latency_ms']['p50']} ms queries={result['queries_per_request']} "
+            f"rss_growth={result['rss_growth_kb']} KB"
+        )
+        return line
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.batch_exports import batch_queryset, process_pool, stream_archive
+from core.exports import EXPORT_FORMATS
+
+
+class Command(BaseCommand):
+    help = 'Export a set of resumes (or all resumes of a user) into one ZIP archive, rendering in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the ZIP archive to write')
+        parser.add_argument('--user', help='Export resumes of this username')
+        parser.add_argument('--ids', type=int, nargs='+', help='Export these resume ids')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='pdf')
+        parser.add_argument('--processes', type=int, default=settings.BATCH_EXPORT_PROCESSES,
+                            help='Rendering processes (default: BATCH_EXPORT_PROCESSES)')
+
+    def handle(self, *args, **options):
+        if not options['user'] and not options['ids']:
+            raise CommandError('Pass --user and/or --ids')
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']} not found")
+        resumes = list(batch_queryset(user=user, ids=options['ids']))
+        if not resumes:
+            raise CommandError('No resumes found')
+
+        start = time.perf_counter()
+        size = 0
+        # Архів пишеться у файл частинами, як і при віддачі через HTTP
+        with open(options['output'], 'wb') as out, process_pool(options['processes']) as executor:
+            for chunk in stream_archive(resumes, options['format'], executor):
+                out.write(chunk)
+                size += len(chunk)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Exported {len(resumes)} resumes to {options['output']} "
+            f"({size // 1024} KB) in {elapsed:.1f}s with {options['processes']} processes"
+        )
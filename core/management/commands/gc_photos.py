@@ -0,0 +1,75 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Resume
+from core.photos import DERIVATIVE_SIZES, derivative_name
+
+
+class Command(BaseCommand):
+    help = 'Delete photo files under MEDIA_ROOT/photos that no resume references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help='Skip files modified less than this many seconds ago (uploads in progress)')
+        parser.add_argument('--rehash', action='store_true',
+                            help='First move photos uploaded before content addressing to hash-named files')
+
+    def handle(self, *args, **options):
+        storage = Resume._meta.get_field('photo').storage
+        if options['rehash'] and not options['dry_run']:
+            self.rehash(storage)
+
+        referenced = set()
+        for name in Resume.objects.exclude(photo='').exclude(photo__isnull=True).values_list('photo', flat=True).iterator():
+            referenced.add(name)
+            referenced.update(derivative_name(name, kind) for kind in DERIVATIVE_SIZES)
+
+        root = storage.path('photos')
+        deadline = time.time() - options['min_age']
+        deleted = 0
+        freed = 0
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                if name in referenced:
+                    continue
+                stat = os.stat(path)
+                if stat.st_mtime > deadline:
+                    continue
+                # Резюме могло почати посилатися на файл після того, як зібрано множину referenced
+                if self.still_referenced(name):
+                    continue
+                deleted += 1
+                freed += stat.st_size
+                if options['dry_run']:
+                    self.stdout.write(f'Would delete {name}')
+                else:
+                    os.remove(path)
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} orphaned file(s), {freed // 1024} KB'))
+
+    def still_referenced(self, name):
+        # photos/<hash>.png і його похідні photos/<hash>.export.jpg мають спільний префікс до першої крапки
+        directory, filename = os.path.split(name)
+        prefix = f"{directory}/{filename.split('.')[0]}."
+        return Resume.objects.filter(photo__startswith=prefix).exists()
+
+    def rehash(self, storage):
+        # Однакові старі файли отримують одне ім'я, копії стають сиротами і видаляються нижче
+        renamed = 0
+        for resume in Resume.objects.exclude(photo='').exclude(photo__isnull=True).iterator():
+            name = resume.photo.name
+            if not storage.exists(name):
+                continue
+            with storage.open(name, 'rb') as content:
+                new_name = storage.save(name, content)
+            if new_name != name:
+                resume.photo.name = new_name
+                resume.save(update_fields=['photo'])
+                renamed += 1
+        self.stdout.write(f'Renamed {renamed} photo(s) to content-addressed names')
@@ -1,31 +1,121 @@
+import json
+import os
+import time
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.forms import SECTION_TYPES
 from core.models import Resume, ResumeSection
+from core.signals import invalidate_resume, suppress_section_signals
+
 
 class Command(BaseCommand):
     help = 'Migrate existing resumes to have exactly five fixed sections'
 
-    def handle(self, *args, **kwargs):
-        SECTION_TYPES = ['personal', 'experience', 'education', 'skills', 'other']
-        for resume in Resume.objects.all():
-            # Видаляємо зайві секції
-            resume.sections.exclude(section_type__in=SECTION_TYPES).delete()
-            # Отримуємо існуючі секції
-            existing_sections = resume.sections.filter(section_type__in=SECTION_TYPES).order_by('order')
-            section_types_map = {section.section_type: section for section in existing_sections}
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Resumes processed per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without writing them')
+        parser.add_argument('--checkpoint', help='File storing the last migrated resume id; the run resumes after it')
+        parser.add_argument('--reset', action='store_true', help='Ignore an existing checkpoint and start over')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        checkpoint = options['checkpoint']
+
+        last_pk = 0
+        if checkpoint and not options['reset'] and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                last_pk = json.load(f)['last_pk']
+            self.stdout.write(f'Resuming after resume {last_pk}')
+
+        resumes = Resume.objects.filter(pk__gt=last_pk).order_by('pk')
+        total = resumes.count()
+        processed = created = deleted = 0
+        start = time.perf_counter()
+
+        for batch in self.batches(resumes.values_list('pk', flat=True).iterator(chunk_size=batch_size), batch_size):
+            batch_created, batch_deleted = self.migrate_batch(batch, dry_run)
+            processed += len(batch)
+            created += batch_created
+            deleted += batch_deleted
+            if checkpoint and not dry_run:
+                self.save_checkpoint(checkpoint, batch[-1])
+            self.report(processed, total, created, deleted, start)
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Migrated {processed} resume(s): created {created} section(s), deleted {deleted} section(s)'
+        ))
+
+    def batches(self, iterator, size):
+        batch = []
+        for item in iterator:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def migrate_batch(self, resume_ids, dry_run):
+        """
+        Обробляє пакет резюме фіксованою кількістю запитів: одне читання секцій,
+        одне видалення зайвих, один bulk_create відсутніх і одне оновлення updated_at.
+        """
+        sections_by_resume = {pk: [] for pk in resume_ids}
+        rows = (
+            ResumeSection.objects.filter(resume_id__in=resume_ids)
+            .order_by('resume_id', 'id')
+            .values_list('id', 'resume_id', 'section_type', 'order')
+        )
+        for row in rows:
+            sections_by_resume[row[1]].append(row)
+
+        to_delete = []
+        to_create = []
+        changed = set()
+        for resume_id, sections in sections_by_resume.items():
+            kept = {}
+            for section_id, _, section_type, order in sections:
+                # Видаляємо секції невідомих типів і дублікати (лишаємо найстарішу секцію типу)
+                if section_type not in SECTION_TYPES or section_type in kept:
+                    to_delete.append(section_id)
+                    changed.add(resume_id)
+                else:
+                    kept[section_type] = order
             # Створюємо відсутні секції
-            used_orders = [section.order for section in existing_sections if section.order is not None]
-            next_order = max(used_orders + [-1]) + 1 if used_orders else 0
+            used_orders = [order for order in kept.values() if order is not None]
+            next_order = max(used_orders) + 1 if used_orders else 0
+            # Нові секції йдуть після наявних: порядок у межах резюме унікальний (UniqueConstraint)
             for section_type in SECTION_TYPES:
-                if section_type not in section_types_map:
-                    order = next_order if next_order < 5 else SECTION_TYPES.index(section_type)
-                    ResumeSection.objects.create(
-                        resume=resume,
-                        section_type=section_type,
-                        content='',
-                        order=order
-                    )
+                if section_type not in kept:
+                    to_create.append(ResumeSection(resume_id=resume_id, section_type=section_type, content='', order=next_order))
+                    changed.add(resume_id)
                     next_order += 1
-            # Видаляємо зайві секції, якщо їх більше 5
-            if resume.sections.count() > len(SECTION_TYPES):
-                resume.sections.filter(section_type__in=SECTION_TYPES).order_by('id')[len(SECTION_TYPES):].delete()
-            self.stdout.write(self.style.SUCCESS(f'Migrated resume {resume.id}: {resume.title}'))
\ No newline at end of file
+
+        if not dry_run and (to_delete or to_create):
+            # bulk_create не надсилає сигналів, а сигнали видалення вимкнені, тому updated_at і кеші
+            # змінених резюме оновлюються один раз на пакет
+            with transaction.atomic(), suppress_section_signals():
+                if to_delete:
+                    ResumeSection.objects.filter(pk__in=to_delete).delete()
+                ResumeSection.objects.bulk_create(to_create, batch_size=1000)
+                Resume.objects.filter(pk__in=changed).touch()
+            for resume_id in changed:
+                invalidate_resume(resume_id)
+        return len(to_create), len(to_delete)
+
+    def save_checkpoint(self, path, last_pk):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_pk': last_pk}, f)
+        os.replace(tmp_path, path)
+
+    def report(self, processed, total, created, deleted, start):
+        elapsed = time.perf_counter() - start
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{processed}/{total} resumes ({rate:.0f}/s), created {created}, deleted {deleted}'
+        )
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.jobs import requeue_stale_jobs, run_pending, start_worker_pool
+
+
+class Command(BaseCommand):
+    help = 'Run a pool of worker processes that render queued PDF/DOCX exports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.EXPORT_WORKER_PROCESSES,
+                            help='Number of worker processes')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Process pending jobs in this process and exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            requeue_stale_jobs()
+            done = run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Processed {done} export job(s)'))
+            return
+
+        workers = start_worker_pool(options['processes'], options['poll_interval'])
+        self.stdout.write(self.style.SUCCESS(f'Started {len(workers)} export worker(s)'))
+        try:
+            while True:
+                # Перезапускаємо воркери, які впали
+                for i, worker in enumerate(workers):
+                    if not worker.is_alive():
+                        self.stderr.write(f'Worker {worker.name} exited with code {worker.exitcode}, restarting')
+                        workers[i] = start_worker_pool(1, options['poll_interval'])[0]
+                time.sleep(5)
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
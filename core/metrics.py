@@ -0,0 +1,86 @@
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+logger = logging.getLogger('core.metrics')
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_timings = {}
+_gauges = {}
+# Сумарні тривалості операцій поточного запиту (див. core.middleware.RequestProfilingMiddleware)
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+# Лічильник подій (кеш-хіти, фолбеки тощо)
+def incr(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+# Поточне значення (розмір кешу, кількість з'єднань тощо)
+def gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+# Реєструє тривалість операції в секундах
+def observe(name, seconds):
+    with _lock:
+        stat = _timings.get(name)
+        if stat is None:
+            stat = _timings[name] = {'count': 0, 'total': 0.0, 'max': 0.0}
+        stat['count'] += 1
+        stat['total'] += seconds
+        stat['max'] = max(stat['max'], seconds)
+    request_timings = _request_timings.get()
+    if request_timings is not None:
+        request_timings[name] = request_timings.get(name, 0.0) + seconds
+    logger.debug("%s took %.2f ms", name, seconds * 1000)
+
+
+# Контекстний менеджер для заміру часу блоку коду
+@contextmanager
+def timer(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_request_timings():
+    """
+    Збирає в словник тривалості всіх observe/timer, виконаних усередині блоку
+    в поточному потоці: рендеринг прев'ю, експорту, побудова стилів PDF тощо.
+    """
+    timings = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def snapshot():
+    """
+    Повертає копію всіх метрик процесу у вигляді словника,
+    придатного для JsonResponse.
+    """
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'gauges': dict(_gauges),
+            'timings': {name: dict(stat) for name, stat in _timings.items()},
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timings.clear()
@@ -0,0 +1,127 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger('core.profiling')
+
+TEMPLATE_RENDER_METRIC = 'templates.render'
+
+
+# Рахує запити до БД і їх час через connection.execute_wrapper, зберігає перші max_logged SQL для журналу
+class QueryRecorder:
+    def __init__(self, max_logged):
+        self.max_logged = max_logged
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.seconds += duration
+            # Параметри не зберігаються: у них можуть бути персональні дані
+            if len(self.queries) < self.max_logged:
+                self.queries.append((context['connection'].alias, duration, sql))
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class RequestProfilingMiddleware:
+    """
+    Профілювання запитів: час в'ю, кількість і час SQL-запитів, час рендерингу шаблонів
+    сторінок, прев'ю і експортів. Підсумки кожного в'ю потрапляють у метрики (/internal/metrics/),
+    повільні запити журналюються разом зі списком SQL, а для вибраних URL частина запитів
+    виконується під cProfile з записом .prof-файлу.
+    Вмикається налаштуванням REQUEST_PROFILING.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_seconds = settings.REQUEST_PROFILING_SLOW_MS / 1000
+        self.profile_paths = [re.compile(pattern) for pattern in settings.REQUEST_PROFILING_PROFILE_PATHS]
+
+    def __call__(self, request):
+        recorder = QueryRecorder(settings.REQUEST_PROFILING_MAX_QUERIES)
+        profiler = self._profiler_for(request)
+        with ExitStack() as stack:
+            timings = stack.enter_context(metrics.collect_request_timings())
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            start = time.perf_counter()
+            if profiler is not None:
+                response = profiler.runcall(self.get_response, request)
+            else:
+                response = self.get_response(request)
+            # Для файлових відповідей це час до першого байта: тіло читається вже після middleware
+            wall = time.perf_counter() - start
+
+        view = _view_name(request)
+        metrics.observe(f'views.{view}', wall)
+        metrics.observe(f'views.{view}.db', recorder.seconds)
+        metrics.incr(f'views.{view}.queries', recorder.count)
+        if wall >= self.slow_seconds:
+            self._log_slow(request, view, response, wall, recorder, timings)
+        if profiler is not None:
+            self._save_profile(request, view, profiler, wall)
+        return response
+
+    def process_template_response(self, request, response):
+        # TemplateResponse рендериться після всіх middleware; час фіксує callback після рендерингу
+        start = time.perf_counter()
+        response.add_post_render_callback(
+            lambda rendered: metrics.observe(TEMPLATE_RENDER_METRIC, time.perf_counter() - start)
+        )
+        return response
+
+    def _profiler_for(self, request):
+        if not any(pattern.search(request.path) for pattern in self.profile_paths):
+            return None
+        if random.random() >= settings.REQUEST_PROFILING_SAMPLE_RATE:
+            return None
+        return cProfile.Profile()
+
+    def _log_slow(self, request, view, response, wall, recorder, timings):
+        details = ', '.join(f'{name}={seconds * 1000:.1f} ms' for name, seconds in sorted(timings.items()))
+        queries = '\n'.join(
+            f'  [{alias}] {duration * 1000:.1f} ms {sql}' for alias, duration, sql in recorder.queries
+        )
+        if recorder.count > len(recorder.queries):
+            queries += f'\n  ... {recorder.count - len(recorder.queries)} more'
+        metrics.incr('requests.slow')
+        logger.warning(
+            "Slow request %s %s (%s) -> %s: %.1f ms, %d queries in %.1f ms%s\n%s",
+            request.method, request.path, view, response.status_code, wall * 1000,
+            recorder.count, recorder.seconds * 1000, f', {details}' if details else '', queries,
+        )
+
+    def _save_profile(self, request, view, profiler, wall):
+        # Файл відкривається через python -m pstats або snakeviz
+        directory = settings.REQUEST_PROFILING_PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        name = re.sub(r'[^\w.-]', '_', view)
+        path = os.path.join(directory, f"{timezone.now():%Y%m%d-%H%M%S-%f}-{name}-{os.getpid()}.prof")
+        profiler.dump_stats(path)
+        metrics.incr('requests.profiled')
+        logger.info("Profiled %s %s (%s) in %.1f ms: %s", request.method, request.path, view, wall * 1000, path)
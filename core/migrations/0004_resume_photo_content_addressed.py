@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:13
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_exportjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resume',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.photo_storage, upload_to='photos/'),
+        ),
+    ]
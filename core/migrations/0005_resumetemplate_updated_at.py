@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_resume_photo_content_addressed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumetemplate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
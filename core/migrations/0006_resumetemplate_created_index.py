@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_resumetemplate_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resumetemplate',
+            index=models.Index(fields=['-created_at', '-id'], name='core_template_created_idx'),
+        ),
+    ]
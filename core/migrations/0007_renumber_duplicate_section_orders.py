@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:34
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def renumber_duplicate_orders(apps, schema_editor):
+    # Перед додаванням UniqueConstraint(resume, order) перенумеровуємо секції резюме,
+    # де порядок повторюється, зберігаючи їхню поточну послідовність
+    ResumeSection = apps.get_model('core', 'ResumeSection')
+    duplicated = {
+        row['resume_id']
+        for row in ResumeSection.objects.values('resume_id', 'order').annotate(count=Count('id')).filter(count__gt=1)
+    }
+    for resume_id in sorted(duplicated):
+        sections = list(ResumeSection.objects.filter(resume_id=resume_id).order_by('order', 'id'))
+        for order, section in enumerate(sections):
+            section.order = order
+        ResumeSection.objects.bulk_update(sections, ['order'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_resumetemplate_created_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicate_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:35
+
+import django.db.models.constraints
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_renumber_duplicate_section_orders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['is_active', '-created_at'], name='core_announce_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['user', '-updated_at'], name='core_resume_user_updated_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='resumesection',
+            constraint=models.UniqueConstraint(deferrable=django.db.models.constraints.Deferrable['DEFERRED'], fields=('resume', 'order'), name='core_section_resume_order_uniq'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='exportjob',
+            name='core_export_status_2ad959_idx',
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='run_after',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='exportjob',
+            index=models.Index(fields=['status', 'run_after'], name='core_exportjob_due_idx'),
+        ),
+    ]
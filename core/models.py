@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .photos import derivative_url
+from .storage import photo_storage
 
 # Модель "Профіль" 
 class Profile(models.Model):
@@ -15,20 +18,43 @@ class Profile(models.Model):
         verbose_name_plural = 'Profiles'
 
 
+# Тіло шаблону (html_template) важить десятки КБ і потрібне лише для рендерингу прев'ю
+class ResumeTemplateQuerySet(models.QuerySet):
+    # Для списків і випадаючих списків: усе, крім тіла шаблону
+    def summary(self):
+        return self.defer('html_template')
+
+
 # Модель "Шаблон для резюме" 
 class ResumeTemplate(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     html_template = models.TextField()  # Зберігає HTML-шаблон для рендерингу
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Валідатор для умовних GET-запитів
     image = models.ImageField(upload_to='templates/', null=True, blank=True)
 
+    objects = ResumeTemplateQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
     class Meta:
         verbose_name = 'Resume Template'
         verbose_name_plural = 'Resume Templates'
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='core_template_created_idx'),  # Галерея шаблонів
+        ]
+
+
+# Запити до резюме з усім, що потрібно для прев'ю та експорту, за фіксовану кількість SQL
+class ResumeQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related('template', 'user').prefetch_related('sections')
+
+    # Оновлює updated_at без save(): для змін секцій і bulk-операцій, що не зачіпають сам рядок резюме
+    def touch(self):
+        return self.update(updated_at=timezone.now())
 
 
 # Модель "Резюме" 
@@ -36,16 +62,26 @@ class Resume(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resumes')
     title = models.CharField(max_length=100)
     template = models.ForeignKey(ResumeTemplate, on_delete=models.SET_NULL, null=True, blank=True)
-    photo = models.ImageField(upload_to='photos/', blank=True, null=True)
+    photo = models.ImageField(upload_to='photos/', storage=photo_storage, blank=True, null=True)  # Файли іменуються за хешем вмісту
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ResumeQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} by {self.user.username}"
 
+    # Зменшена копія фото для сторінок застосунку; оригінал показується лише при завантаженні
+    @property
+    def photo_preview_url(self):
+        return derivative_url(self.photo, 'preview') if self.photo else None
+
     class Meta:
         verbose_name = 'Resume'
         verbose_name_plural = 'Resumes'
+        indexes = [
+            models.Index(fields=['user', '-updated_at'], name='core_resume_user_updated_idx'),  # Список резюме користувача
+        ]
 
 
 # Модель "Секція резюме" 
@@ -62,6 +98,7 @@ class ResumeSection(models.Model):
     content = models.TextField()
     order = models.IntegerField(default=0)
 
+
     def __str__(self):
         return f"{self.section_type} for {self.resume.title}"
 
@@ -69,6 +106,15 @@ class ResumeSection(models.Model):
         verbose_name = 'Resume Section'
         verbose_name_plural = 'Resume Sections'
         ordering = ['order']
+        constraints = [
+            # Індекс обмеження (resume, order) обслуговує і вибірку секцій резюме за порядком.
+            # Перевірка відкладена до COMMIT, щоб можна було поміняти секції місцями
+            models.UniqueConstraint(
+                fields=['resume', 'order'],
+                name='core_section_resume_order_uniq',
+                deferrable=models.Deferrable.DEFERRED,
+            ),
+        ]
 
 
 # Модель "Оголошення" 
@@ -85,4 +131,45 @@ class Announcement(models.Model):
     class Meta:
         verbose_name = 'Announcement'
         verbose_name_plural = 'Announcements'
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', '-created_at'], name='core_announce_active_idx'),
+        ]
+
+# Модель "Фоновий експорт резюме" (черга задач у БД)
+class ExportJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+    FORMAT_CHOICES = (
+        ('pdf', 'PDF'),
+        ('docx', 'DOCX'),
+    )
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='export_jobs')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    fingerprint = models.CharField(max_length=64, blank=True)  # Ключ готового файлу в кеші експортів
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Воркер не бере задачу раніше цього часу; попередній рендеринг при збереженні відкладається
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.format} export of resume {self.resume_id} ({self.status})"
+
+    class Meta:
+        verbose_name = 'Export Job'
+        verbose_name_plural = 'Export Jobs'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='core_exportjob_due_idx'),
+        ]
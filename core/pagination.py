@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+# Курсорна пагінація за первинним ключем: сталий час на сторінку без COUNT(*) і OFFSET
+class IdCursorPagination(CursorPagination):
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -0,0 +1,116 @@
+import io
+import logging
+import os
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.utils.functional import cached_property
+from PIL import Image, ImageOps
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Розміри похідних зображень у пікселях: фото в експорті займає 5x5 см (~600 px при 300 dpi)
+DERIVATIVE_SIZES = {
+    'export': (600, 600),
+    'preview': (300, 300),
+}
+
+
+def derivative_name(name, kind):
+    # photos/frog.png -> photos/frog.export.jpg (поруч з оригіналом)
+    base = os.path.splitext(name)[0]
+    return f"{base}.{kind}.jpg"
+
+
+def _render_derivative(original, size):
+    with Image.open(original) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(size, Image.LANCZOS)
+        if image.mode != 'RGB':
+            # Прозорі PNG кладемо на білий фон, JPEG не підтримує альфа-канал
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+            image = background
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=85, optimize=True)
+    return output.getvalue()
+
+
+def generate_derivatives(photo):
+    """
+    Створює всі відсутні похідні зображення для завантаженого фото.
+    Викликається один раз після збереження резюме з новим фото.
+    """
+    storage = photo.storage
+    for kind, size in DERIVATIVE_SIZES.items():
+        name = derivative_name(photo.name, kind)
+        if storage.exists(name):
+            continue
+        with metrics.timer('photos.derivative'):
+            with storage.open(photo.name, 'rb') as original:
+                data = _render_derivative(original, size)
+        storage.save_exact(name, ContentFile(data))
+
+
+def _ensure_derivative(photo, kind):
+    # Для фото, завантажених до появи похідних, створюємо їх при першому зверненні
+    name = derivative_name(photo.name, kind)
+    if photo.storage.exists(name):
+        return name
+    try:
+        generate_derivatives(photo)
+    except Exception as e:
+        logger.warning("Error generating photo derivatives for %s: %s", photo.name, e)
+        return None
+    return name
+
+
+def derivative_path(photo, kind):
+    # Шлях до похідного зображення; якщо його не вдалося створити, повертається оригінал
+    name = _ensure_derivative(photo, kind)
+    return photo.storage.path(name) if name else photo.path
+
+
+def derivative_url(photo, kind):
+    name = _ensure_derivative(photo, kind)
+    return photo.storage.url(name) if name else photo.url
+
+
+class DerivativePhoto:
+    """
+    Фото для контексту html_template: url вказує на похідне зображення, а не на оригінал.
+    Для WeasyPrint (as_file=True) url - це file:// шлях до похідного файлу.
+    """
+
+    def __init__(self, photo, kind, as_file=False):
+        self.name = photo.name
+        self._photo = photo
+        self._kind = kind
+        self._as_file = as_file
+
+    def __bool__(self):
+        return bool(self._photo)
+
+    def __str__(self):
+        return self.name
+
+    @cached_property
+    def url(self):
+        if self._as_file:
+            return Path(derivative_path(self._photo, self._kind)).as_uri()
+        return derivative_url(self._photo, self._kind)
+
+
+class TemplateResume:
+    # Резюме для збережених шаблонів: resume.photo.url у шаблоні віддає похідне зображення
+    def __init__(self, resume, kind, as_file=False):
+        self._resume = resume
+        self.photo = DerivativePhoto(resume.photo, kind, as_file) if resume.photo else resume.photo
+
+    def __getattr__(self, name):
+        return getattr(self._resume, name)
+
+    def __str__(self):
+        return str(self._resume)
@@ -0,0 +1,87 @@
+import time
+
+from django.core.cache import caches
+
+from . import metrics
+from .photos import TemplateResume
+from .template_cache import compiled_templates
+
+RESUME_VERSION_KEY = 'preview:resume-version:{}'
+TEMPLATE_VERSION_KEY = 'preview:template-version:{}'
+FRAGMENT_KEY = 'preview:fragment:{resume}:{template}:{resume_version}:{template_version}'
+
+
+def _cache():
+    return caches['previews']
+
+
+def _new_version():
+    # Якщо лічильник витіснено з кешу, нове значення не збіжеться з жодним старим
+    return time.time_ns()
+
+
+def bump_version(key):
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def current_version(key):
+    cache = _cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+# Інвалідація фрагментів резюме (зміна резюме або будь-якої його секції)
+def bump_resume_version(resume_pk):
+    bump_version(RESUME_VERSION_KEY.format(resume_pk))
+
+
+# Інвалідація фрагментів усіх резюме, що використовують шаблон
+def bump_template_version(template_pk):
+    bump_version(TEMPLATE_VERSION_KEY.format(template_pk))
+
+
+def _versions(resume_pk, template_pk):
+    cache = _cache()
+    keys = [RESUME_VERSION_KEY.format(resume_pk), TEMPLATE_VERSION_KEY.format(template_pk)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def render_preview(resume, sections):
+    """
+    Повертає HTML-фрагмент резюме, відрендерений його шаблоном. Повторні перегляди
+    незміненого резюме віддаються з кешу без звернення до шаблонізатора.
+    """
+    template = resume.template
+    resume_version, template_version = _versions(resume.pk, template.pk)
+    key = FRAGMENT_KEY.format(
+        resume=resume.pk, template=template.pk,
+        resume_version=resume_version, template_version=template_version,
+    )
+    cache = _cache()
+    html = cache.get(key)
+    if html is not None:
+        metrics.incr('preview_cache.hit')
+        return html
+
+    metrics.incr('preview_cache.miss')
+    with metrics.timer('preview.render'):
+        template_resume = TemplateResume(resume, 'preview')
+        html = compiled_templates.get(template).render({
+            'resume': template_resume,
+            'sections': sections,
+            'photo_url': template_resume.photo.url if resume.photo else None,
+        })
+    cache.set(key, html)
+    return html
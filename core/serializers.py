@@ -1,36 +1,145 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Profile, ResumeTemplate, Resume, ResumeSection, Announcement
+from .signals import invalidate_resume, suppress_section_signals
+
+
+def requested_fields(request):
+    """
+    Повертає множину полів з параметра ?fields=a,b або None, якщо його не передано.
+    Діє лише для читання, щоб запис не ігнорував частину даних.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(',') if field.strip()}
+
+
+# Міксин для розріджених наборів полів: ?fields=id,title повертає лише ці поля
+class DynamicFieldsMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'))
+        if fields is not None:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
 
 # Серіалізатор для моделі "Profile"
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = "__all__"
 
 
 # Серіалізатор для моделі "ResumeTemplate"
-class ResumeTemplateSerializer(serializers.ModelSerializer):
+class ResumeTemplateSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ResumeTemplate
         fields = "__all__"
 
 
 # Серіалізатор для моделі "Resume"
-class ResumeSerializer(serializers.ModelSerializer):
+class ResumeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = "__all__"
 
 
 # Серіалізатор для моделі "ResumeSection"
-class ResumeSectionSerializer(serializers.ModelSerializer):
+class ResumeSectionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ResumeSection
         fields = "__all__"
 
 
 # Серіалізатор для моделі "Announcement"
-class AnnouncementSerializer(serializers.ModelSerializer):
+class AnnouncementSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Announcement
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+
+# Короткий опис шаблону без html_template (для вкладення та списків)
+class ResumeTemplateSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumeTemplate
+        fields = ('id', 'name', 'description', 'image', 'created_at')
+
+
+# Секція у складі резюме
+class ResumeSectionNestedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumeSection
+        fields = ('id', 'section_type', 'content', 'order')
+
+
+# Повне резюме для читання: секції за порядком і короткий опис шаблону.
+# Очікує queryset з Resume.objects.with_related(), тоді будь-яка кількість резюме читається двома запитами
+class ResumeDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    template = ResumeTemplateSummarySerializer(read_only=True)
+    sections = ResumeSectionNestedSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Resume
+        fields = ('id', 'user', 'title', 'template', 'photo', 'created_at', 'updated_at', 'sections')
+
+
+# Пакетне збереження всіх секцій резюме: instance - список поточних секцій, context['resume'] - резюме
+class ResumeSectionBulkListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        orders = [item['order'] for item in attrs]
+        if len(orders) != len(set(orders)):
+            raise serializers.ValidationError("Порядок секцій має бути унікальним.")
+        ids = [item['id'] for item in attrs if 'id' in item]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Кожна секція може зустрічатися лише один раз.")
+        unknown = set(ids) - {section.pk for section in self.instance}
+        if unknown:
+            raise serializers.ValidationError(f"Секції {sorted(unknown)} не належать цьому резюме.")
+        return attrs
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        """
+        Замінює секції резюме переданими: оновлює наявні одним bulk_update, створює нові
+        одним bulk_create і видаляє відсутні у запиті. Кількість запитів не залежить від кількості секцій.
+        """
+        resume = self.context['resume']
+        existing = {section.pk: section for section in instance}
+        keep_ids = {item['id'] for item in validated_data if 'id' in item}
+        with suppress_section_signals():
+            ResumeSection.objects.filter(resume=resume).exclude(pk__in=keep_ids).delete()
+
+        to_update = []
+        to_create = []
+        for item in validated_data:
+            item = dict(item)
+            section_id = item.pop('id', None)
+            if section_id is None:
+                to_create.append(ResumeSection(resume=resume, **item))
+            else:
+                section = existing[section_id]
+                for field, value in item.items():
+                    setattr(section, field, value)
+                to_update.append(section)
+        ResumeSection.objects.bulk_update(to_update, ['section_type', 'content', 'order'])
+        ResumeSection.objects.bulk_create(to_create)
+
+        # bulk-операції не надсилають сигналів і не оновлюють updated_at резюме
+        Resume.objects.filter(pk=resume.pk).touch()
+        invalidate_resume(resume.pk)
+        return sorted(to_update + to_create, key=lambda section: section.order)
+
+
+class ResumeSectionBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = ResumeSection
+        fields = ('id', 'section_type', 'content', 'order')
+        # Порядок обов'язковий: без нього унікальність порядку в запиті не перевірити
+        extra_kwargs = {'content': {'allow_blank': True}, 'order': {'required': True}}
+        list_serializer_class = ResumeSectionBulkListSerializer
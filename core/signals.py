@@ -0,0 +1,86 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .export_cache import get_export_cache
+from .html_exports import pdf_assets
+from .models import Resume, ResumeSection, ResumeTemplate
+from .photos import generate_derivatives
+from .preview_cache import bump_resume_version, bump_template_version
+from .template_gallery import bump_gallery_version
+from .template_cache import compiled_templates
+
+logger = logging.getLogger(__name__)
+
+_section_signals_suppressed = ContextVar('section_signals_suppressed', default=False)
+
+
+def _bump_now_and_after_commit(bump, *args):
+    # Версія змінюється одразу і ще раз після COMMIT: паралельний запит, що між цими моментами
+    # прочитав дані до коміту і закешував їх під проміжною версією, їх уже не віддасть
+    bump(*args)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump(*args))
+
+
+def invalidate_resume(resume_pk):
+    """
+    Скидає кеш експортів і прев'ю резюме. Викликається сигналами, а також вручну
+    після bulk_create/bulk_update/update(), які сигналів не надсилають.
+    """
+    get_export_cache().invalidate(resume_pk)
+    _bump_now_and_after_commit(bump_resume_version, resume_pk)
+
+
+@contextmanager
+def suppress_section_signals():
+    """
+    Вимикає обробку сигналів секцій для пакетних змін: delete() по QuerySet надсилає post_delete
+    для кожного рядка. Після блоку викликач сам оновлює updated_at резюме і викликає invalidate_resume.
+    """
+    token = _section_signals_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _section_signals_suppressed.reset(token)
+
+
+# Скидаємо кеш експортів і прев'ю при зміні резюме або його секцій
+@receiver(post_save, sender=Resume)
+@receiver(post_delete, sender=Resume)
+def invalidate_resume_caches(sender, instance, **kwargs):
+    invalidate_resume(instance.pk)
+
+
+# Похідні зображення фото створюються один раз після завантаження
+@receiver(post_save, sender=Resume)
+def create_photo_derivatives(sender, instance, **kwargs):
+    if instance.photo:
+        try:
+            generate_derivatives(instance.photo)
+        except Exception as e:
+            logger.warning("Error generating photo derivatives for %s: %s", instance.photo.name, e)
+
+
+@receiver(post_save, sender=ResumeSection)
+@receiver(post_delete, sender=ResumeSection)
+def invalidate_section_caches(sender, instance, **kwargs):
+    if _section_signals_suppressed.get():
+        return
+    # ETag і Last-Modified резюме рахуються з updated_at, тож зміна секції його оновлює
+    Resume.objects.filter(pk=instance.resume_id).touch()
+    invalidate_resume(instance.resume_id)
+
+
+# Прибираємо скомпільовану версію, стилі PDF і фрагменти прев'ю зміненого шаблону, а також сторінки галереї
+@receiver(post_save, sender=ResumeTemplate)
+@receiver(post_delete, sender=ResumeTemplate)
+def invalidate_template_caches(sender, instance, **kwargs):
+    compiled_templates.invalidate(instance.pk)
+    pdf_assets.invalidate(instance.pk)
+    _bump_now_and_after_commit(bump_template_version, instance.pk)
+    _bump_now_and_after_commit(bump_gallery_version)
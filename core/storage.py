@@ -0,0 +1,41 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+# Сховище, що називає файли за SHA-256 вмісту: однакові зображення зберігаються один раз
+class ContentAddressedStorage(FileSystemStorage):
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, f"{digest.hexdigest()}{extension}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Такий самий файл уже збережено, просто посилаємось на нього. Оновлюємо mtime,
+            # щоб gc_photos --min-age не видалив файл, на який щойно знову почали посилатися
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def save_exact(self, name, content):
+        # Записує файл під заданим ім'ям без хешування (для похідних зображень)
+        return super().save(name, content)
+
+
+def photo_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,61 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.template import engines
+
+from . import metrics
+
+
+# LRU-кеш скомпільованих HTML-шаблонів резюме в межах процесу
+class CompiledTemplateCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template):
+        """
+        Повертає скомпільований шаблон для ResumeTemplate. Ключ містить хеш тексту,
+        тож змінений шаблон ніколи не віддасться зі старої версії навіть в іншому процесі.
+        """
+        key = (template.pk, hashlib.sha1(template.html_template.encode('utf-8')).hexdigest())
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.incr('template_cache.hit')
+                return compiled
+
+        compiled = engines['django'].from_string(template.html_template)
+        with self._lock:
+            self.misses += 1
+            metrics.incr('template_cache.miss')
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            metrics.gauge('template_cache.size', len(self._entries))
+        return compiled
+
+    def invalidate(self, template_pk):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == template_pk]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'max_size': self.max_size}
+
+
+compiled_templates = CompiledTemplateCache(settings.COMPILED_TEMPLATE_CACHE_SIZE)
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+
+from . import metrics
+from .models import ResumeTemplate
+from .preview_cache import bump_version, current_version
+
+GALLERY_VERSION_KEY = 'gallery:version'
+GALLERY_PAGE_KEY = 'gallery:page:{version}:{page_size}:{cursor}'
+# Галерея не показує html_template, тож і не вибирає його з БД
+GALLERY_FIELDS = ('id', 'name', 'description', 'image', 'created_at')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# Курсор - позиція останнього шаблону сторінки: created_at і id (на випадок однакового часу)
+def encode_cursor(template):
+    return f"{template.created_at.isoformat()}_{template.pk}"
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = cursor.rsplit('_', 1)
+        created_at, pk = datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        raise InvalidCursor(cursor)
+    if created_at.tzinfo is None:
+        raise InvalidCursor(cursor)
+    return created_at, pk
+
+
+def page_size_from(value):
+    # Некоректне значення замінюється типовим, завелике обрізається, щоб не роздувати кеш
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return settings.TEMPLATE_GALLERY_PAGE_SIZE
+    return min(max(page_size, 1), settings.TEMPLATE_GALLERY_MAX_PAGE_SIZE)
+
+
+# Інвалідація всіх сторінок галереї (створення, зміна або видалення шаблону)
+def bump_gallery_version():
+    bump_version(GALLERY_VERSION_KEY)
+
+
+def gallery_version():
+    return current_version(GALLERY_VERSION_KEY)
+
+
+def gallery_page(cursor, page_size):
+    """
+    Повертає сторінку галереї після курсора. Вибірка йде за індексом (-created_at, -id)
+    без COUNT і OFFSET, а готовий JSON-словник кешується до наступної зміни шаблонів.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    key = GALLERY_PAGE_KEY.format(
+        version=gallery_version(),
+        page_size=page_size,
+        cursor=f"{position[0].astimezone(timezone.utc):%Y%m%d%H%M%S%f}-{position[1]}" if position else 'first',
+    )
+    cache = caches['previews']
+    payload = cache.get(key)
+    if payload is not None:
+        metrics.incr('gallery_cache.hit')
+        return payload
+
+    metrics.incr('gallery_cache.miss')
+    queryset = ResumeTemplate.objects.only(*GALLERY_FIELDS).order_by('-created_at', '-id')
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    templates = list(queryset[:page_size + 1])  # Зайвий рядок показує, чи є наступна сторінка
+    has_next = len(templates) > page_size
+    templates = templates[:page_size]
+    payload = {
+        'templates': [{
+            'id': template.id,
+            'name': template.name,
+            'description': template.description,
+            'image': template.image.url if template.image else None,
+        } for template in templates],
+        'has_next': has_next,
+        'next_cursor': encode_cursor(templates[-1]) if has_next else None,
+    }
+    cache.set(key, payload)
+    return payload
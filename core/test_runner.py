@@ -0,0 +1,32 @@
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Тести не пишуть у кеші й медіа проєкту: кеш прев'ю і галереї живе в пам'яті процесу,
+    а експорти, файли і профілі - у тимчасовому каталозі, що видаляється після запуску.
+    Інакше версії в файловому кеші переживали б тестову БД і пасували б до повторно виданих pk.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._workdir = tempfile.mkdtemp(prefix='resume-builder-tests-')
+        self._overrides = override_settings(
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+                'previews': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'previews'},
+            },
+            EXPORT_CACHE_DIR=f'{self._workdir}/exports',
+            MEDIA_ROOT=f'{self._workdir}/media',
+            REQUEST_PROFILING_PROFILE_DIR=f'{self._workdir}/profiles',
+        )
+        self._overrides.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._overrides.disable()
+        shutil.rmtree(self._workdir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -1,9 +1,47 @@
-from django.test import TestCase, Client
+import io
+import json
+import os
+import pstats
+import random
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from django.db import IntegrityError, connection, transaction
 from django.contrib.auth.models import User, Group
 from django.urls import reverse
-from .models import Profile, ResumeTemplate, Resume, ResumeSection, Announcement
-from .forms import RegistrationForm, ProfileForm, ResumeForm, ResumeSectionForm, AnnouncementForm
+from django.utils import timezone
+from datetime import timedelta
+from .models import Profile, ResumeTemplate, Resume, ResumeSection, Announcement, ExportJob
+from .forms import RegistrationForm, ProfileForm, ResumeForm, ResumeSectionForm, AnnouncementForm, get_section_formset
 from .serializers import ProfileSerializer, ResumeTemplateSerializer, ResumeSerializer, ResumeSectionSerializer, AnnouncementSerializer
+from .fonts import get_font_registry
+from .export_cache import ExportCache
+from . import metrics
+from .jobs import run_pending, enqueue_export
+from .preview_cache import render_preview
+from .batch_exports import shutdown_web_pool, web_pool
+from .benchmark_suite import SCENARIOS, _photo, build_corpus, compare_results, run_scenario
+from .exports import build_pdf
+from .photos import derivative_name
+from .template_cache import compiled_templates
+from .html_exports import pdf_assets, split_styles, url_fetcher, weasyprint_available
+from .exports import pdf_engine_for
+from .export_cache import export_fingerprint
+
+# Кеш прев'ю у тестах живе лише в пам'яті процесу
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'previews': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'previews'},
+}
 
 # Тестування моделей
 class ModelTests(TestCase):
@@ -97,6 +135,7 @@ class FormTests(TestCase):
 
 
 # Тестування в'юшок
+@override_settings(CACHES=TEST_CACHES)
 class ViewTests(TestCase):
     def setUp(self):
         """Налаштування для тестів в'юшок"""
@@ -220,7 +259,7 @@ class ViewTests(TestCase):
 
     def test_template_ajax(self):
         """Тест AJAX-в'ю для шаблонів"""
-        response = self.client.get(reverse('template_ajax') + '?page=1')
+        response = self.client.get(reverse('template_ajax'))
         self.assertEqual(response.status_code, 200)
         self.assertTrue('templates' in response.json())
 
@@ -280,4 +319,1267 @@ class SerializerTests(TestCase):
         self.assertEqual(serializer.data['content'], 'Контент')
         self.assertEqual(serializer.data['created_by'], user.pk)
 
+
+# Тестування реєстру шрифтів
+class FontRegistryTests(TestCase):
+    def test_fonts_loaded_once(self):
+        """Тест, що шрифти реєструються один раз і стилі перевикористовуються"""
+        registry = get_font_registry()
+        self.assertEqual(registry.font_name, 'DejaVuSans')
+        self.assertIs(get_font_registry().styles['section_body'], registry.styles['section_body'])
+
+
+# Тестування кешу експортів
+class ExportCacheTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Тестове резюме')
+        self.section = ResumeSection.objects.create(resume=self.resume, section_type='personal', content='Контент')
+        self.url = reverse('export_pdf', kwargs={'pk': self.resume.pk})
+        self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(self.resume.pk)), True)
+        metrics.reset()
+
+    def test_repeat_download_served_from_cache(self):
+        """Тест, що повторне завантаження віддається з кешу без перебудови"""
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(b''.join(first.streaming_content), b''.join(second.streaming_content))
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(metrics.snapshot()['counters']['export_cache.hit'], 1)
+
+    def test_docx_streamed_with_content_length(self):
+        """Тест, що DOCX віддається потоком з файлу із заголовком Content-Length"""
+        response = self.client.get(reverse('export_docx', kwargs={'pk': self.resume.pk}))
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(body))
+
+    def test_if_none_match_returns_304(self):
+        """Тест відповіді 304 для незміненого резюме"""
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_section_save_invalidates_cache(self):
+        """Тест інвалідації кешу та зміни ETag при збереженні секції"""
+        etag = self.client.get(self.url)['ETag']
+        self.section.content = 'Новий контент'
+        self.section.save()
+        self.assertEqual(os.listdir(os.path.join(settings.EXPORT_CACHE_DIR, str(self.resume.pk))), [])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_long_section_splits_across_pages(self):
+        """Тест, що довга секція переноситься на кілька сторінок PDF, а розмітка в тексті екранується"""
+        self.section.content = '\n'.join(f'Рядок {i} <b>&' for i in range(200))
+        self.section.save()
+        out = io.BytesIO()
+        build_pdf(self.resume, list(self.resume.sections.all()), out)
+        pages = re.findall(rb'/Type /Page\b(?!s)', out.getvalue())
+        self.assertGreater(len(pages), 1)
+
+    def test_lru_eviction(self):
+        """Тест витіснення найдавніше використаних файлів при перевищенні розміру"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        cache = ExportCache(directory, max_size=250)
+        for i, fingerprint in enumerate(['a', 'b', 'c']):
+            cache.store(1, fingerprint, 'pdf', lambda out: out.write(b'x' * 100)).close()
+            os.utime(os.path.join(directory, '1', f'{fingerprint}.pdf'), (i, i))
+        cache.evict()
+        self.assertIsNone(cache.open(1, 'a', 'pdf'))
+        fp = cache.open(1, 'c', 'pdf')
+        self.assertIsNotNone(fp)
+        fp.close()
+
+    def test_store_scans_cache_only_over_limit(self):
+        """Тест, що запис у кеш сканує каталог лише при перевищенні ліміту, а витіснення залишає запас"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        cache = ExportCache(directory, max_size=1000)
+        with mock.patch.object(ExportCache, '_all_entries', autospec=True,
+                               side_effect=ExportCache._all_entries) as scan:
+            for i in range(10):
+                cache.store(1, f'f{i}', 'pdf', lambda out: out.write(b'x' * 100)).close()
+            self.assertEqual(scan.call_count, 1)  # лише перший запис: розмір ще невідомий
+            cache.store(1, 'f10', 'pdf', lambda out: out.write(b'x' * 100)).close()
+            self.assertEqual(scan.call_count, 2)
+            cache.store(1, 'f11', 'pdf', lambda out: out.write(b'x' * 100)).close()
+            self.assertEqual(scan.call_count, 2)
+        self.assertEqual(len(os.listdir(os.path.join(directory, '1'))), 10)
+        cache.invalidate(1)
+        cache.evict()
+        self.assertEqual(metrics.snapshot()['gauges']['export_cache.size'], 0)
+
+
+# Тестування фонової черги експортів
+class ExportJobTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Тестове резюме')
+        self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(self.resume.pk)), True)
+
+    def test_enqueue_and_download(self):
+        """Тест постановки експорту в чергу, обробки воркером і завантаження"""
+        response = self.client.post(reverse('export_docx', kwargs={'pk': self.resume.pk}))
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).json()['status'], 'pending')
+
+        self.assertEqual(run_pending(), 1)
+        data = self.client.get(status_url).json()
+        self.assertEqual(data['status'], 'done')
+        response = self.client.get(data['download_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+
+    def test_anonymous_enqueue_redirects_to_login(self):
+        """Тест, що анонімний POST експорту переадресовується на вхід без створення задачі"""
+        self.client.logout()
+        response = self.client.post(reverse('export_pdf', kwargs={'pk': self.resume.pk}))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_download_of_stale_job_requeues(self):
+        """Тест, що завантаження застарілого результату ставить експорт у чергу, а не будує його в запиті"""
+        response = self.client.post(reverse('export_pdf', kwargs={'pk': self.resume.pk}))
+        run_pending()
+        download_url = self.client.get(response.json()['status_url']).json()['download_url']
+        self.resume.title = 'Нова назва'
+        self.resume.save()  # Скидає кеш експортів резюме
+        with mock.patch('core.views.render_export') as render:
+            response = self.client.get(download_url)
+        render.assert_not_called()
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.json()['status'], 'pending')
+        self.assertEqual(ExportJob.objects.filter(status=ExportJob.STATUS_PENDING).count(), 1)
+
+    def test_duplicate_enqueue_reuses_pending_job(self):
+        """Тест, що повторний запит не створює дубліката задачі"""
+        url = reverse('export_pdf', kwargs={'pk': self.resume.pk})
+        first = self.client.post(url).json()
+        second = self.client.post(url).json()
+        self.assertEqual(first['id'], second['id'])
+        self.assertEqual(ExportJob.objects.count(), 1)
+
+    def test_download_before_done(self):
+        """Тест, що незавершений експорт не завантажується"""
+        job = ExportJob.objects.create(resume=self.resume, format='pdf')
+        response = self.client.get(reverse('export_job_download', kwargs={'pk': job.pk}))
+        self.assertEqual(response.status_code, 409)
+
+
+# Тестування попереднього рендерингу експортів при збереженні резюме
+@override_settings(CACHES=TEST_CACHES, EXPORT_PRERENDER_ON_SAVE=True, EXPORT_PRERENDER_DELAY=30)
+class PrerenderOnSaveTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме')
+        self.section = ResumeSection.objects.create(resume=self.resume, section_type='skills', content='Python', order=0)
+        self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(self.resume.pk)), True)
+
+    def save_resume(self, content):
+        data = {
+            'title': 'Резюме',
+            'sections-TOTAL_FORMS': 1,
+            'sections-INITIAL_FORMS': 1,
+            'sections-0-id': self.section.pk,
+            'sections-0-resume': self.resume.pk,
+            'sections-0-section_type': 'skills',
+            'sections-0-content': content,
+            'sections-0-order': 0,
+        }
+        response = self.client.post(reverse('resume_edit', kwargs={'pk': self.resume.pk}), data)
+        self.assertEqual(response.status_code, 302)
+
+    def test_saves_are_debounced(self):
+        """Тест, що серія збережень планує один відкладений рендеринг кожного формату"""
+        self.save_resume('Python')
+        first = dict(ExportJob.objects.values_list('format', 'run_after'))
+        self.save_resume('Python, Django')
+        jobs = dict(ExportJob.objects.values_list('format', 'run_after'))
+        self.assertEqual(sorted(jobs), ['docx', 'pdf'])
+        self.assertGreaterEqual(jobs['pdf'], first['pdf'])
+        self.assertGreater(jobs['pdf'], timezone.now())
+        self.assertEqual(run_pending(), 0)  # Час рендерингу ще не настав
+
+    @override_settings(EXPORT_PRERENDER_MAX_WAIT=60)
+    def test_postponement_is_capped(self):
+        """Тест, що безперервне редагування не відкладає рендеринг далі за EXPORT_PRERENDER_MAX_WAIT"""
+        self.save_resume('Python')
+        ExportJob.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+        self.save_resume('Python, Django')
+        self.assertEqual(run_pending(), 2)
+
+    def test_download_served_from_prerendered_file(self):
+        """Тест, що після попереднього рендерингу завантаження лише читає файл"""
+        self.save_resume('Python, Django')
+        ExportJob.objects.update(run_after=timezone.now())
+        self.assertEqual(run_pending(), 2)
+        with mock.patch.dict('core.exports.EXPORT_FORMATS', {'pdf': ('application/pdf', mock.Mock())}) as formats:
+            response = self.client.get(reverse('export_pdf', kwargs={'pk': self.resume.pk}))
+            formats['pdf'][1].assert_not_called()
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_explicit_export_is_not_delayed(self):
+        """Тест, що запит експорту користувачем забирає відкладену задачу без очікування"""
+        self.save_resume('Python')
+        job = enqueue_export(self.resume, 'docx')
+        self.assertEqual(ExportJob.objects.filter(format='docx').count(), 1)
+        self.assertLessEqual(job.run_after, timezone.now())
+        self.assertEqual(run_pending(), 1)
+
+    @override_settings(EXPORT_PRERENDER_ON_SAVE=False)
+    def test_disabled(self):
+        """Тест, що без налаштування збереження не ставить задач"""
+        self.save_resume('Python')
+        self.assertFalse(ExportJob.objects.exists())
+
+
+# Тестування кешу скомпільованих шаблонів
+@override_settings(CACHES=TEST_CACHES)
+class CompiledTemplateCacheTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.template = ResumeTemplate.objects.create(name='Шаблон', html_template='<h1>{{ resume.title }}</h1>')
+        self.resume = Resume.objects.create(user=self.user, title='Тестове резюме', template=self.template)
+        self.url = reverse('resume_preview', kwargs={'pk': self.resume.pk})
+        compiled_templates.clear()
+
+    def test_preview_reuses_compiled_template(self):
+        """Тест, що повторний перегляд не компілює шаблон заново"""
+        self.client.get(self.url)
+        self.resume.save()  # Скидаємо кеш фрагмента, щоб шаблон рендерився вдруге
+        response = self.client.get(self.url)
+        self.assertContains(response, '<h1>Тестове резюме</h1>')
+        self.assertEqual(compiled_templates.stats()['misses'], 1)
+        self.assertEqual(compiled_templates.stats()['hits'], 1)
+
+    def test_template_save_invalidates(self):
+        """Тест інвалідації кешу при збереженні шаблону"""
+        self.client.get(self.url)
+        self.template.html_template = '<h2>{{ resume.title }}</h2>'
+        self.template.save()
+        self.assertEqual(compiled_templates.stats()['size'], 0)
+        self.assertContains(self.client.get(self.url), '<h2>Тестове резюме</h2>')
+
+    def test_metrics_view_staff_only(self):
+        """Тест, що метрики доступні лише персоналу"""
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 302)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hits', response.json()['compiled_templates'])
+
+
+# Тестування кешу відрендерених фрагментів прев'ю
+@override_settings(CACHES=TEST_CACHES)
+class PreviewCacheTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.template = ResumeTemplate.objects.create(
+            name='Шаблон',
+            html_template='{% for s in sections %}<p>{{ s.content }}</p>{% endfor %}',
+        )
+        self.resume = Resume.objects.create(user=self.user, title='Тестове резюме', template=self.template)
+        self.section = ResumeSection.objects.create(resume=self.resume, section_type='skills', content='Python')
+        self.url = reverse('resume_preview', kwargs={'pk': self.resume.pk})
+        compiled_templates.clear()
+        metrics.reset()
+
+    def test_repeat_preview_skips_template_engine(self):
+        """Тест, що повторний перегляд віддає фрагмент з кешу"""
+        self.client.get(self.url)
+        self.assertContains(self.client.get(self.url), '<p>Python</p>')
+        counters = metrics.snapshot()['counters']
+        self.assertEqual(counters['preview_cache.hit'], 1)
+        self.assertEqual(compiled_templates.stats()['hits'] + compiled_templates.stats()['misses'], 1)
+
+    def test_section_save_invalidates_fragment(self):
+        """Тест інвалідації фрагмента при збереженні секції"""
+        self.client.get(self.url)
+        self.section.content = 'Django'
+        self.section.save()
+        self.assertContains(self.client.get(self.url), '<p>Django</p>')
+
+    def test_template_save_invalidates_fragment(self):
+        """Тест інвалідації фрагмента при збереженні шаблону"""
+        self.client.get(self.url)
+        self.template.html_template = '<div>{{ resume.title }}</div>'
+        self.template.save()
+        self.assertContains(self.client.get(self.url), '<div>Тестове резюме</div>')
+
+    def test_fragment_cached_before_commit_is_not_served(self):
+        """Тест, що фрагмент, закешований до COMMIT зміни, після коміту не віддається"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.section.content = 'Django'
+            self.section.save()
+            # Паралельний запит ще бачить старі дані, але вже нову версію резюме
+            stale = ResumeSection(resume=self.resume, section_type='skills', content='Застаріле')
+            render_preview(self.resume, [stale])
+        self.assertContains(self.client.get(self.url), '<p>Django</p>')
+
+
+# Тестування кількості SQL-запитів: вона не повинна залежати від кількості резюме чи секцій
+@override_settings(CACHES=TEST_CACHES)
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.template = ResumeTemplate.objects.create(
+            name='Шаблон',
+            html_template='{{ resume.user.username }}{% for s in sections %}{{ s }}{% endfor %}',
+        )
+
+    def make_resume(self, sections):
+        resume = Resume.objects.create(user=self.user, title='Резюме', template=self.template)
+        for i in range(sections):
+            ResumeSection.objects.create(resume=resume, section_type='other', content='Контент', order=i)
+        self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(resume.pk)), True)
+        return resume
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_resume_list_constant_queries(self):
+        """Тест, що список резюме виконує сталу кількість запитів"""
+        self.make_resume(1)
+        one = self.count_queries(reverse('resumes'))
+        for _ in range(4):
+            self.make_resume(1)
+        self.assertEqual(self.count_queries(reverse('resumes')), one)
+        self.assertLessEqual(one, 3)
+
+    def test_preview_and_exports_constant_queries(self):
+        """Тест, що прев'ю та експорти не виконують запитів на кожну секцію"""
+        small = self.make_resume(1)
+        large = self.make_resume(5)
+        # Прев'ю робить ще один запит за часовими мітками для ETag/Last-Modified
+        for name, budget in (('resume_preview', 5), ('export_pdf', 4), ('export_docx', 4)):
+            small_count = self.count_queries(reverse(name, kwargs={'pk': small.pk}))
+            large_count = self.count_queries(reverse(name, kwargs={'pk': large.pk}))
+            self.assertEqual(small_count, large_count, name)
+            self.assertLessEqual(large_count, budget, name)
+
+
+def make_photo(name='photo.png', size=(1200, 1000)):
+    """Створює PNG-файл із шумом (погано стискається) для завантаження у тестах"""
+    output = io.BytesIO()
+    Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3)).save(output, format='PNG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+# Тестування похідних зображень фото
+@override_settings(CACHES=TEST_CACHES)
+class PhotoDerivativeTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме', photo=make_photo())
+        self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(self.resume.pk)), True)
+
+    def test_derivatives_created_on_upload(self):
+        """Тест створення зменшених копій фото поруч з оригіналом"""
+        storage = self.resume.photo.storage
+        for kind, limit in (('export', 600), ('preview', 300)):
+            name = derivative_name(self.resume.photo.name, kind)
+            self.assertTrue(storage.exists(name))
+            with Image.open(storage.path(name)) as image:
+                self.assertLessEqual(max(image.size), limit)
+
+    def test_exports_embed_derivative(self):
+        """Тест, що експорти вбудовують зменшене фото, а не оригінал"""
+        original_size = self.resume.photo.size
+        response = self.client.get(reverse('export_docx', kwargs={'pk': self.resume.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(int(response['Content-Length']), original_size // 2)
+        response = self.client.get(reverse('export_pdf', kwargs={'pk': self.resume.pk}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_pages_show_preview_derivative(self):
+        """Тест, що форма і збережені шаблони з resume.photo.url показують зменшене фото"""
+        preview_url = self.resume.photo.storage.url(derivative_name(self.resume.photo.name, 'preview'))
+        response = self.client.get(reverse('resume_edit', kwargs={'pk': self.resume.pk}))
+        self.assertContains(response, preview_url)
+        self.assertNotContains(response, f'src="{self.resume.photo.url}"')
+        self.resume.template = ResumeTemplate.objects.create(
+            name='Шаблон', html_template='<img src="{{ resume.photo.url }}"><h1>{{ resume.title }}</h1>',
+        )
+        self.resume.save()
+        response = self.client.get(reverse('resume_preview', kwargs={'pk': self.resume.pk}))
+        self.assertContains(response, f'<img src="{preview_url}"><h1>Резюме</h1>')
+
+
+# Тестування дедуплікації фото та прибирання файлів-сиріт
+class PhotoStorageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+
+    def test_identical_uploads_share_one_file(self):
+        """Тест, що однакові зображення зберігаються одним файлом"""
+        photo = make_photo(size=(50, 50))
+        content = photo.read()
+        first = Resume.objects.create(user=self.user, title='Перше', photo=SimpleUploadedFile('a.png', content))
+        second = Resume.objects.create(user=self.user, title='Друге', photo=SimpleUploadedFile('b.png', content))
+        self.assertEqual(first.photo.name, second.photo.name)
+        self.assertNotEqual(first.photo.name, 'photos/a.png')
+
+    def test_gc_removes_only_orphans(self):
+        """Тест видалення файлів, на які не посилається жодне резюме"""
+        resume = Resume.objects.create(user=self.user, title='Резюме', photo=make_photo(size=(50, 50)))
+        storage = resume.photo.storage
+        orphan = storage.save_exact('photos/orphan.png', make_photo(size=(10, 10)))
+        call_command('gc_photos', min_age=0, stdout=io.StringIO())
+        self.assertFalse(storage.exists(orphan))
+        self.assertTrue(storage.exists(resume.photo.name))
+        self.assertTrue(storage.exists(derivative_name(resume.photo.name, 'export')))
+
+    def test_dedupe_refreshes_mtime(self):
+        """Тест, що повторне завантаження того самого фото оновлює mtime файлу"""
+        content = make_photo(size=(50, 50)).read()
+        first = Resume.objects.create(user=self.user, title='Перше', photo=SimpleUploadedFile('a.png', content))
+        path = first.photo.path
+        os.utime(path, (0, 0))
+        Resume.objects.create(user=self.user, title='Друге', photo=SimpleUploadedFile('b.png', content))
+        self.assertGreater(os.stat(path).st_mtime, 0)
+
+    def test_gc_rechecks_references_before_delete(self):
+        """Тест, що файл, на який посилання з'явилося під час прибирання, не видаляється"""
+        storage = Resume._meta.get_field('photo').storage
+        name = storage.save_exact('photos/late.png', make_photo(size=(10, 10)))
+        walk = os.walk
+
+        def walk_after_upload(root):
+            Resume.objects.create(user=self.user, title='Пізнє', photo=name)
+            return walk(root)
+
+        with mock.patch('core.management.commands.gc_photos.os.walk', walk_after_upload):
+            call_command('gc_photos', min_age=0, stdout=io.StringIO())
+        self.assertTrue(storage.exists(name))
+
+
+# Тестування клонування резюме
+class CloneTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме')
+        for i, section_type in enumerate(['personal', 'experience', 'skills']):
+            ResumeSection.objects.create(resume=self.resume, section_type=section_type, content='Контент', order=i)
+        self.url = reverse('resume_bulk_clone')
+
+    def post(self, items):
+        return self.client.post(self.url, json.dumps({'resumes': items}), content_type='application/json')
+
+    def test_clone_view_copies_sections(self):
+        """Тест клонування одного резюме разом із секціями"""
+        self.client.get(reverse('resume_clone', kwargs={'pk': self.resume.pk}))
+        clone = Resume.objects.get(title='Copy of Резюме')
+        self.assertEqual(list(clone.sections.values_list('section_type', 'order')),
+                         list(self.resume.sections.values_list('section_type', 'order')))
+
+    def test_bulk_clone_constant_queries(self):
+        """Тест, що кількість запитів пакетного клонування не залежить від розміру пакета"""
+        with CaptureQueriesContext(connection) as small:
+            self.post([{'id': self.resume.pk, 'title': 'A'}])
+        with CaptureQueriesContext(connection) as large:
+            response = self.post([{'id': self.resume.pk, 'title': f'Вакансія {i}'} for i in range(10)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['resumes']), 10)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(ResumeSection.objects.filter(resume__title='Вакансія 9').count(), 3)
+
+    def test_bulk_clone_rolls_back_on_failure(self):
+        """Тест повного відкату пакета при помилці"""
+        with mock.patch.object(ResumeSection.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post([{'id': self.resume.pk}, {'id': self.resume.pk}])
+        self.assertEqual(Resume.objects.count(), 1)
+
+    def test_bulk_clone_invalid_items(self):
+        """Тест, що некоректні id і назви відхиляються з 400"""
+        for items in ([{'id': self.resume.pk, 'title': 5}], [{'id': str(self.resume.pk)}], [{'id': True}], ['x']):
+            with self.subTest(items=items):
+                self.assertEqual(self.post(items).status_code, 400)
+        self.assertEqual(Resume.objects.count(), 1)
+
+    def test_bulk_clone_foreign_resume(self):
+        """Тест, що чуже резюме не клонується"""
+        other = Resume.objects.create(user=User.objects.create(username='other'), title='Чуже')
+        response = self.post([{'id': self.resume.pk}, {'id': other.pk}])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Resume.objects.count(), 2)
+
+
+# Тестування команди migrate_resume_sections
+class MigrateResumeSectionsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.resumes = [Resume.objects.create(user=self.user, title=f'Резюме {i}') for i in range(3)]
+        ResumeSection.objects.create(resume=self.resumes[0], section_type='skills', content='Python', order=0)
+        ResumeSection.objects.create(resume=self.resumes[0], section_type='skills', content='Дублікат', order=1)
+        ResumeSection.objects.create(resume=self.resumes[1], section_type='hobby', content='Невідомий тип', order=0)
+
+    def call(self, **options):
+        call_command('migrate_resume_sections', stdout=io.StringIO(), **options)
+
+    def test_every_resume_gets_five_sections(self):
+        """Тест, що кожне резюме отримує рівно п'ять секцій різних типів"""
+        self.call(batch_size=2)
+        for resume in self.resumes:
+            types = list(resume.sections.values_list('section_type', flat=True))
+            self.assertEqual(sorted(types), sorted(['personal', 'experience', 'education', 'skills', 'other']))
+        self.assertEqual(self.resumes[0].sections.get(section_type='skills').content, 'Python')
+
+    def test_batch_queries_do_not_depend_on_deleted_rows(self):
+        """Тест, що кількість запитів пакета не залежить від кількості видалених секцій"""
+        def queries():
+            with CaptureQueriesContext(connection) as ctx:
+                self.call(batch_size=10)
+            return len(ctx.captured_queries)
+
+        self.call(batch_size=10)
+        ResumeSection.objects.create(resume=self.resumes[2], section_type='hobby', content='Зайве', order=10)
+        one = queries()
+        for i in range(10):
+            ResumeSection.objects.create(resume=self.resumes[2], section_type='hobby', content='Зайве', order=20 + i)
+        self.assertEqual(queries(), one)
+        self.assertFalse(ResumeSection.objects.filter(section_type='hobby').exists())
+
+    def test_dry_run_changes_nothing(self):
+        """Тест, що режим --dry-run нічого не змінює"""
+        self.call(dry_run=True)
+        self.assertEqual(ResumeSection.objects.count(), 3)
+
+    def test_checkpoint_resumes_after_last_batch(self):
+        """Тест продовження міграції з контрольної точки"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        checkpoint = os.path.join(directory, 'checkpoint.json')
+        with open(checkpoint, 'w') as f:
+            json.dump({'last_pk': self.resumes[1].pk}, f)
+        self.call(checkpoint=checkpoint)
+        self.assertEqual(self.resumes[0].sections.count(), 2)
+        self.assertEqual(self.resumes[2].sections.count(), 5)
+        with open(checkpoint) as f:
+            self.assertEqual(json.load(f)['last_pk'], self.resumes[2].pk)
+
+
+# Тестування пагінації, фільтрів і вибору полів API
+class APIListTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме')
+        self.other = Resume.objects.create(user=self.user, title='Інше')
+        for i in range(3):
+            ResumeSection.objects.create(resume=self.resume, section_type='other', content=f'Секція {i}', order=i)
+        ResumeSection.objects.create(resume=self.other, section_type='other', content='Чужа секція')
+
+    def test_cursor_pagination(self):
+        """Тест курсорної пагінації списку секцій"""
+        url = reverse('resume-sections-list-api')
+        first = self.client.get(url, {'page_size': 3}).json()
+        self.assertEqual(len(first['results']), 3)
+        self.assertIsNotNone(first['next'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+
+    def test_filter_sections_by_resume(self):
+        """Тест фільтрації секцій за резюме"""
+        response = self.client.get(reverse('resume-sections-list-api'), {'resume': self.other.pk})
+        self.assertEqual([s['content'] for s in response.json()['results']], ['Чужа секція'])
+        response = self.client.get(reverse('resume-sections-list-api'), {'resume': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_sparse_fieldsets(self):
+        """Тест, що ?fields= повертає і вибирає з БД лише запитані поля"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('resume-sections-list-api'), {'fields': 'id,order'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'order'})
+        self.assertNotIn('content', ctx.captured_queries[-1]['sql'])
+
+
+# Тестування вкладеного серіалізатора резюме
+class NestedResumeAPITests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.template = ResumeTemplate.objects.create(name='Шаблон', html_template='<p>великий шаблон</p>')
+        self.resumes = []
+        for i in range(3):
+            resume = Resume.objects.create(user=self.user, title=f'Резюме {i}', template=self.template)
+            ResumeSection.objects.create(resume=resume, section_type='skills', content='Python', order=1)
+            ResumeSection.objects.create(resume=resume, section_type='personal', content='Ім\'я', order=0)
+            self.resumes.append(resume)
+
+    def test_detail_includes_ordered_sections_and_template(self):
+        """Тест, що резюме повертається з секціями за порядком і коротким шаблоном"""
+        with self.assertNumQueries(3):  # валідатори ETag, резюме з шаблоном, секції
+            data = self.client.get(reverse('resume-detail-api', kwargs={'pk': self.resumes[0].pk})).json()
+        self.assertEqual([s['section_type'] for s in data['sections']], ['personal', 'skills'])
+        self.assertEqual(data['template']['name'], 'Шаблон')
+        self.assertNotIn('html_template', data['template'])
+
+    def test_bulk_ids_constant_queries(self):
+        """Тест отримання кількох резюме за ?ids= фіксованою кількістю запитів"""
+        ids = ','.join(str(resume.pk) for resume in self.resumes)
+        with self.assertNumQueries(2):
+            data = self.client.get(reverse('resumes-list-api'), {'ids': ids}).json()
+        self.assertEqual([resume['id'] for resume in data], [resume.pk for resume in self.resumes])
+        self.assertEqual(len(data[2]['sections']), 2)
+
+
+# Тестування пакетного збереження секцій резюме
+class BulkSectionsAPITests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме')
+        self.first = ResumeSection.objects.create(resume=self.resume, section_type='personal', content='Ім\'я', order=0)
+        self.second = ResumeSection.objects.create(resume=self.resume, section_type='skills', content='Python', order=1)
+        self.url = reverse('resume-sections-bulk-api', kwargs={'pk': self.resume.pk})
+
+    def put(self, data):
+        return self.client.put(self.url, json.dumps(data), content_type='application/json')
+
+    def test_upsert_reorder_and_delete(self):
+        """Тест оновлення, перевпорядкування, створення і видалення секцій одним запитом"""
+        response = self.put([
+            {'id': self.second.pk, 'section_type': 'skills', 'content': 'Django', 'order': 0},
+            {'section_type': 'education', 'content': 'КПІ', 'order': 1},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s['section_type'] for s in response.json()], ['skills', 'education'])
+        sections = list(self.resume.sections.order_by('order'))
+        self.assertEqual([(s.section_type, s.content) for s in sections], [('skills', 'Django'), ('education', 'КПІ')])
+        self.assertFalse(ResumeSection.objects.filter(pk=self.first.pk).exists())
+
+    def test_query_count_does_not_depend_on_section_count(self):
+        """Тест, що кількість запитів не залежить від кількості секцій"""
+        def payload(count):
+            return [{'section_type': 'other', 'content': str(i), 'order': i} for i in range(count)]
+        with CaptureQueriesContext(connection) as small:
+            self.put(payload(2))
+        with CaptureQueriesContext(connection) as large:
+            self.put(payload(20))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(self.resume.sections.count(), 20)
+
+    def test_delete_query_count_does_not_depend_on_section_count(self):
+        """Тест, що видалення секцій виконується одним запитом, без сигналів для кожного рядка"""
+        ResumeSection.objects.bulk_create(
+            ResumeSection(resume=self.resume, section_type='other', content=str(i), order=i) for i in range(2, 20)
+        )
+        keep = [{'id': self.first.pk, 'section_type': 'personal', 'content': 'A', 'order': 0}]
+        with CaptureQueriesContext(connection) as many:
+            self.put(keep)
+        ResumeSection.objects.create(resume=self.resume, section_type='other', content='B', order=1)
+        with CaptureQueriesContext(connection) as one:
+            self.put(keep)
+        self.assertEqual(len(many), len(one))
+        self.assertEqual(self.resume.sections.count(), 1)
+
+    def test_missing_order_rejected(self):
+        """Тест, що секція без порядку відхиляється з 400"""
+        response = self.put([{'section_type': 'skills', 'content': 'Python'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.resume.sections.count(), 2)
+
+    def test_duplicate_order_rejected(self):
+        """Тест, що однаковий порядок секцій відхиляється без змін у БД"""
+        response = self.put([
+            {'id': self.first.pk, 'section_type': 'personal', 'content': 'A', 'order': 0},
+            {'id': self.second.pk, 'section_type': 'skills', 'content': 'B', 'order': 0},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ResumeSection.objects.get(pk=self.first.pk).content, 'Ім\'я')
+
+    def test_foreign_section_rejected(self):
+        """Тест, що секцію іншого резюме не можна змінити через це резюме"""
+        other = Resume.objects.create(user=self.user, title='Інше')
+        foreign = ResumeSection.objects.create(resume=other, section_type='other', content='Чужа', order=0)
+        response = self.put([{'id': foreign.pk, 'section_type': 'other', 'content': 'Зламано', 'order': 0}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ResumeSection.objects.get(pk=foreign.pk).content, 'Чужа')
+
+    def test_only_owner_can_replace_sections(self):
+        """Тест, що анонім і інший користувач не можуть замінити секції резюме"""
+        self.client.logout()
+        self.assertEqual(self.put([]).status_code, 403)
+        User.objects.create_user(username='other', password='testpassword')
+        self.client.login(username='other', password='testpassword')
+        self.assertEqual(self.put([]).status_code, 404)
+        self.assertEqual(self.resume.sections.count(), 2)
+
+    def test_invalidates_export_cache(self):
+        """Тест, що пакетне збереження скидає кеш експортів резюме"""
+        with mock.patch('core.serializers.invalidate_resume') as invalidate:
+            self.put([{'id': self.first.pk, 'section_type': 'personal', 'content': 'Нове', 'order': 0}])
+        invalidate.assert_called_once_with(self.resume.pk)
+
+
+# Тестування умовних GET-запитів (ETag/Last-Modified)
+@override_settings(CACHES=TEST_CACHES)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.template = ResumeTemplate.objects.create(name='Шаблон', html_template='<p>{{ resume.title }}</p>')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме', template=self.template)
+        self.section = ResumeSection.objects.create(resume=self.resume, section_type='skills', content='Python')
+
+    def assertRevalidates(self, url, change):
+        """Перший запит віддає ETag, повторний - 304 без тіла, після зміни - знову 200"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        # Лише сесія/користувач і запит за часовими мітками
+        self.assertLessEqual(len(ctx.captured_queries), 3)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_resume_detail_api(self):
+        """Тест ETag резюме в API: зміна секції робить відповідь новою"""
+        url = reverse('resume-detail-api', kwargs={'pk': self.resume.pk})
+        self.assertTrue(self.client.get(url).has_header('Last-Modified'))
+
+        def change():
+            self.section.content = 'Django'
+            self.section.save()
+        self.assertRevalidates(url, change)
+
+    def test_resume_preview(self):
+        """Тест ETag сторінки прев'ю: зміна шаблону робить відповідь новою"""
+        def change():
+            self.template.html_template = '<h1>{{ resume.title }}</h1>'
+            self.template.save()
+        self.assertRevalidates(reverse('resume_preview', kwargs={'pk': self.resume.pk}), change)
+
+    def test_resume_preview_session_state(self):
+        """Тест, що новий CSRF-токен і непоказані повідомлення не дають 304 для сторінки прев'ю"""
+        url = reverse('resume_preview', kwargs={'pk': self.resume.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.cookies['csrftoken'] = 'a' * 32  # Як після повторного входу
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        other = Resume.objects.create(user=self.user, title='Інше')
+        self.client.post(reverse('resume_delete', kwargs={'pk': other.pk}))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Резюме видалено!')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_template_list_api(self):
+        """Тест ETag списку шаблонів: видалення шаблону робить відповідь новою"""
+        extra = ResumeTemplate.objects.create(name='Другий', html_template='<p></p>')
+        self.assertRevalidates(reverse('resume-templates-list-api'), extra.delete)
+
+    def test_template_ajax(self):
+        """Тест ETag AJAX-списку шаблонів"""
+        def change():
+            ResumeTemplate.objects.create(name='Новий', html_template='<p></p>')
+        self.assertRevalidates(reverse('template_ajax'), change)
+
+    def test_foreign_preview_not_found(self):
+        """Тест, що валідатори не розкривають існування чужого резюме"""
+        other = User.objects.create_user(username='other', password='testpassword')
+        foreign = Resume.objects.create(user=other, title='Чуже')
+        response = self.client.get(reverse('resume_preview', kwargs={'pk': foreign.pk}))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+
+
+# Тестування галереї шаблонів на головній сторінці
+@override_settings(CACHES=TEST_CACHES, TEMPLATE_GALLERY_PAGE_SIZE=2)
+class TemplateGalleryTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.templates = [
+            ResumeTemplate.objects.create(name=f'Шаблон {i}', html_template='<p>великий шаблон</p>')
+            for i in range(5)
+        ]
+        # Два шаблони з однаковим часом створення: порядок між ними визначає id
+        ResumeTemplate.objects.filter(pk=self.templates[1].pk).update(created_at=self.templates[2].created_at)
+
+    def get(self, **params):
+        response = self.client.get(reverse('template_ajax'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_keyset_pages_cover_all_templates(self):
+        """Тест, що сторінки за курсором містять усі шаблони рівно один раз, від нових до старих"""
+        names = []
+        data = self.get(page_size=1)  # Межа сторінки проходить і між шаблонами з однаковим часом
+        while True:
+            names += [template['name'] for template in data['templates']]
+            if not data['has_next']:
+                break
+            data = self.get(cursor=data['next_cursor'], page_size=1)
+        self.assertEqual(names, ['Шаблон 4', 'Шаблон 3', 'Шаблон 2', 'Шаблон 1', 'Шаблон 0'])
+
+    def test_page_size_param(self):
+        """Тест параметра page_size і його обмеження"""
+        self.assertEqual(len(self.get(page_size=4)['templates']), 4)
+        self.assertEqual(len(self.get(page_size=0)['templates']), 1)
+        self.assertEqual(len(self.get(page_size='abc')['templates']), 2)
+
+    def test_page_cached_until_template_changes(self):
+        """Тест, що повторний запит сторінки не звертається до БД, а зміна шаблону скидає кеш"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.get()
+        self.assertNotIn('html_template', ctx.captured_queries[-1]['sql'])
+        with self.assertNumQueries(0):
+            self.get()
+        self.templates[4].name = 'Перейменований'
+        self.templates[4].save()
+        self.assertEqual(self.get()['templates'][0]['name'], 'Перейменований')
+
+    def test_invalid_cursor(self):
+        """Тест відповіді на некоректний курсор"""
+        response = self.client.get(reverse('template_ajax'), {'cursor': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+
+# Тестування того, що списки шаблонів не завантажують html_template
+class TemplateSummaryTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.template = ResumeTemplate.objects.create(name='Шаблон', html_template='<p>великий шаблон</p>')
+        Resume.objects.create(user=self.user, title='Резюме', template=self.template)
+
+    def assertNoTemplateBody(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        template_queries = [q['sql'] for q in ctx.captured_queries if 'core_resumetemplate' in q['sql']]
+        self.assertTrue(template_queries, url)
+        for sql in template_queries:
+            self.assertNotIn('html_template', sql, url)
+        return response
+
+    def test_list_pages(self):
+        """Тест сторінок зі списками шаблонів і резюме та форми створення резюме"""
+        for name in ('templates', 'resumes', 'resume_create'):
+            self.assertNoTemplateBody(reverse(name))
+
+    def test_template_list_api(self):
+        """Тест, що список шаблонів в API віддає короткий серіалізатор"""
+        response = self.assertNoTemplateBody(reverse('resume-templates-list-api'))
+        self.assertNotIn('html_template', response.json()['results'][0])
+        detail = self.client.get(reverse('resume-template-detail-api', kwargs={'pk': self.template.pk}))
+        self.assertEqual(detail.json()['html_template'], '<p>великий шаблон</p>')
+
+    def test_form_accepts_deferred_template(self):
+        """Тест, що форма резюме приймає шаблон із відкладеним html_template"""
+        form = ResumeForm({'title': 'Нове', 'template': self.template.pk})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['template'].html_template, '<p>великий шаблон</p>')
+
+
+# Тестування унікальності порядку секцій і індексів гарячих запитів
+@override_settings(CACHES=TEST_CACHES)
+class SectionOrderTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме')
+        self.sections = [
+            ResumeSection.objects.create(resume=self.resume, section_type=section_type, content=section_type, order=i)
+            for i, section_type in enumerate(['personal', 'experience', 'education', 'skills', 'other'])
+        ]
+
+    def post_orders(self, orders):
+        data = {
+            'title': 'Резюме',
+            'sections-TOTAL_FORMS': len(self.sections),
+            'sections-INITIAL_FORMS': len(self.sections),
+        }
+        for i, (section, order) in enumerate(zip(self.sections, orders)):
+            data.update({
+                f'sections-{i}-id': section.pk,
+                f'sections-{i}-resume': self.resume.pk,
+                f'sections-{i}-section_type': section.section_type,
+                f'sections-{i}-content': section.content,
+                f'sections-{i}-order': order,
+            })
+        return self.client.post(reverse('resume_edit', kwargs={'pk': self.resume.pk}), data)
+
+    def orders(self):
+        return [ResumeSection.objects.get(pk=section.pk).order for section in self.sections]
+
+    def test_swap_orders(self):
+        """Тест, що секції можна поміняти місцями одним збереженням"""
+        response = self.post_orders([1, 0, 2, 3, 4])
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.orders(), [1, 0, 2, 3, 4])
+
+    def test_duplicate_orders_rejected(self):
+        """Тест, що однаковий порядок секцій відхиляється за обмеженням моделі"""
+        response = self.post_orders([0, 0, 2, 3, 4])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Порядок секцій має бути унікальним.')
+        self.assertEqual(self.orders(), [0, 1, 2, 3, 4])
+
+    def test_missing_sections_placed_after_existing(self):
+        """Тест, що відсутні секції створюються з вільним порядком"""
+        ResumeSection.objects.filter(pk__in=[s.pk for s in self.sections[1:4]]).delete()
+        ResumeSection.objects.filter(pk=self.sections[0].pk).update(order=2)
+        get_section_formset(resume=self.resume)
+        orders = list(self.resume.sections.values_list('order', flat=True))
+        self.assertEqual(len(orders), 5)
+        self.assertEqual(len(set(orders)), 5)
+
+    def test_section_error_rolls_back_resume(self):
+        """Тест, що помилка БД при збереженні секцій відкочує і зміни самого резюме"""
+        data = {
+            'title': 'Нова назва',
+            'sections-TOTAL_FORMS': 0,
+            'sections-INITIAL_FORMS': 0,
+        }
+        # SQLite не підтримує відкладені обмеження, тож помилку COMMIT імітуємо
+        with mock.patch('core.forms.BaseSectionFormSet.save', side_effect=IntegrityError):
+            response = self.client.post(reverse('resume_edit', kwargs={'pk': self.resume.pk}), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Порядок секцій має бути унікальним.')
+        self.resume.refresh_from_db()
+        self.assertEqual(self.resume.title, 'Резюме')
+
+    @skipUnless(connection.features.supports_deferrable_unique_constraints, 'потрібні відкладені обмеження')
+    def test_database_rejects_duplicate_order(self):
+        """Тест, що БД не допускає двох секцій резюме з однаковим порядком"""
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SET CONSTRAINTS core_section_resume_order_uniq IMMEDIATE')
+                ResumeSection.objects.create(resume=self.resume, section_type='other', content='', order=0)
+
+
+# EXPLAIN-перевірки мають сенс лише на PostgreSQL, що використовується в продакшні
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN-тести виконуються лише на PostgreSQL')
+class IndexUsageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме')
+        Announcement.objects.create(title='Оголошення', content='Текст', created_by=self.user)
+        # На кількох рядках планувальник обирає seq scan, тож вимикаємо його в межах тестової транзакції
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(index_name, queryset.explain())
+
+    def test_resume_list(self):
+        """Тест, що список резюме користувача читається за індексом (user, -updated_at)"""
+        queryset = Resume.objects.filter(user=self.user).order_by('-updated_at')
+        self.assertUsesIndex(queryset, 'core_resume_user_updated_idx')
+
+    def test_resume_sections(self):
+        """Тест, що секції резюме читаються за індексом обмеження (resume, order)"""
+        self.assertUsesIndex(ResumeSection.objects.filter(resume=self.resume), 'core_section_resume_order_uniq')
+
+    def test_active_announcements(self):
+        """Тест, що активні оголошення читаються за індексом (is_active, -created_at)"""
+        queryset = Announcement.objects.filter(is_active=True).order_by('-created_at')
+        self.assertUsesIndex(queryset, 'core_announce_active_idx')
+
+
+# Тестування сторінки стану з'єднань з БД
+class DatabaseConnectionsViewTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+    def test_staff_only(self):
+        """Тест, що стан з'єднань доступний лише персоналу і не відкриває пул"""
+        self.assertEqual(self.client.get(reverse('db_connections')).status_code, 302)
+        self.user.is_staff = True
+        self.user.save()
+        data = self.client.get(reverse('db_connections')).json()
+        self.assertEqual(data['default']['vendor'], connection.vendor)
+        self.assertIn('conn_max_age', data['default'])
+        self.assertFalse(data['default']['pooled'])
+        self.assertIsNone(data['default']['pool'])
+
+
+# Тестування PDF-експорту через html_template і WeasyPrint
+@override_settings(CACHES=TEST_CACHES)
+class HtmlPdfExportTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.template = ResumeTemplate.objects.create(
+            name='Шаблон',
+            html_template='<style>h1 { color: navy; }</style><h1>{{ resume.title }}</h1>'
+                          '{% for s in sections %}<p>{{ s.content }}</p>{% endfor %}',
+        )
+        self.resume = Resume.objects.create(user=self.user, title='Резюме', template=self.template)
+        ResumeSection.objects.create(resume=self.resume, section_type='skills', content='Python')
+        self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(self.resume.pk)), True)
+        self.addCleanup(pdf_assets.clear)
+
+    def test_engine_selection(self):
+        """Тест вибору рушія: WeasyPrint лише для резюме з шаблоном"""
+        self.assertEqual(pdf_engine_for(self.resume), 'reportlab')
+        with self.settings(PDF_ENGINE='weasyprint'):
+            self.assertEqual(pdf_engine_for(self.resume), 'weasyprint')
+            self.assertEqual(pdf_engine_for(Resume(user=self.user, title='Без шаблону')), 'reportlab')
+
+    def test_fingerprint_depends_on_engine(self):
+        """Тест, що PDF різних рушіїв не змішуються в кеші експортів"""
+        sections = list(self.resume.sections.all())
+        reportlab = export_fingerprint(self.resume, sections, 'pdf')
+        with self.settings(PDF_ENGINE='weasyprint'):
+            self.assertNotEqual(export_fingerprint(self.resume, sections, 'pdf'), reportlab)
+
+    def test_split_styles(self):
+        """Тест винесення статичних стилів шаблону для одноразового розбору"""
+        body, styles = split_styles(self.template.html_template + '<style>p { color: {{ color }}; }</style>')
+        self.assertEqual(styles, ['h1 { color: navy; }'])
+        self.assertNotIn('navy', body)
+        self.assertIn('{{ color }}', body)
+
+    def test_url_fetcher_restricted(self):
+        """Тест, що шаблон не може підвантажити довільний файл або мережевий ресурс"""
+        for url in ('file:///etc/passwd', 'https://example.com/a.png', 'file:///media/../etc/passwd'):
+            with self.assertRaises(ValueError):
+                url_fetcher(url)
+
+    @skipUnless(weasyprint_available(), 'WeasyPrint або Pango не встановлено')
+    def test_export_uses_template_and_caches_assets(self):
+        """Тест PDF з html_template: стилі шаблону розбираються один раз"""
+        metrics.reset()
+        with self.settings(PDF_ENGINE='weasyprint'):
+            response = self.client.get(reverse('export_pdf', kwargs={'pk': self.resume.pk}))
+            pdf = b''.join(response.streaming_content)
+            self.assertTrue(pdf.startswith(b'%PDF'))
+            self.resume.save()  # Новий відбиток - новий рендеринг
+            b''.join(self.client.get(reverse('export_pdf', kwargs={'pk': self.resume.pk})).streaming_content)
+        counters = metrics.snapshot()['counters']
+        self.assertEqual(counters['pdf_assets.miss'], 1)
+        self.assertEqual(counters['pdf_assets.hit'], 1)
+
+
+# Тестування пакетного експорту резюме в ZIP
+@override_settings(CACHES=TEST_CACHES, BATCH_EXPORT_PROCESSES=1)
+class BatchExportTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.resumes = []
+        for i in range(3):
+            resume = Resume.objects.create(user=self.user, title='Резюме')  # Однакові назви
+            ResumeSection.objects.create(resume=resume, section_type='skills', content=f'Навички {i}')
+            self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(resume.pk)), True)
+            self.resumes.append(resume)
+        other = User.objects.create_user(username='other', password='testpassword')
+        self.foreign = Resume.objects.create(user=other, title='Чуже')
+
+    def download(self, **params):
+        response = self.client.get(reverse('export_zip'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_all_user_resumes(self):
+        """Тест архіву з усіма резюме користувача без чужих"""
+        archive = self.download(format='docx')
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), [f'Резюме-{r.pk}.docx' for r in self.resumes])
+
+    def test_selected_ids(self):
+        """Тест архіву з вибраних резюме; чужі id ігноруються"""
+        ids = f'{self.resumes[1].pk},{self.foreign.pk}'
+        archive = self.download(ids=ids)
+        self.assertEqual(archive.namelist(), [f'Резюме-{self.resumes[1].pk}.pdf'])
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b'%PDF'))
+        response = self.client.get(reverse('export_zip'), {'ids': self.foreign.pk})
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_params(self):
+        """Тест відповіді на некоректний формат і список id"""
+        self.assertEqual(self.client.get(reverse('export_zip'), {'format': 'txt'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export_zip'), {'ids': '1,a'}).status_code, 400)
+        with self.settings(BATCH_EXPORT_MAX=2):
+            self.assertEqual(self.client.get(reverse('export_zip')).status_code, 400)
+
+    def test_failed_resume_listed_in_errors(self):
+        """Тест, що помилка одного резюме не зриває весь архів"""
+        from .exports import build_docx
+
+        def flaky(resume, sections, out):
+            if resume.pk == self.resumes[0].pk:
+                raise ValueError('зламаний документ')
+            build_docx(resume, sections, out)
+
+        with mock.patch.dict('core.exports.EXPORT_FORMATS', {'docx': ('application/octet-stream', flaky)}):
+            archive = self.download(format='docx')
+        self.assertEqual(len(archive.namelist()), 3)
+        self.assertIn('зламаний документ', archive.read('errors.txt').decode())
+
+    def test_concurrency_limit(self):
+        """Тест, що зайняті слоти дають 503, а завершене завантаження звільняє слот"""
+        with mock.patch('core.batch_exports._web_slots', threading.BoundedSemaphore(1)):
+            self.download()
+            self.download()
+        with mock.patch('core.batch_exports._web_slots', threading.BoundedSemaphore(0)):
+            response = self.client.get(reverse('export_zip'))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(BATCH_EXPORT_PROCESSES=2)
+    def test_shared_web_pool(self):
+        """Тест спільного пулу веб-процесу: рендеринг у дочірніх процесах, метрики в батьківському"""
+        self.addCleanup(shutdown_web_pool)
+        metrics.reset()
+        archive = self.download(format='docx')
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(len(archive.namelist()), 3)
+        self.assertIs(web_pool(), web_pool())
+        data = metrics.snapshot()
+        self.assertEqual(data['timings']['batch_exports.render']['count'], 3)
+        # Батьківський процес лише читає готові файли з кешу
+        self.assertEqual(data['counters'].get('export_cache.miss', 0), 0)
+        self.assertEqual(data['counters']['export_cache.hit'], 3)
+
+    def test_process_pool_command(self):
+        """Тест команди, що будує архів у пулі процесів"""
+        path = os.path.join(settings.EXPORT_CACHE_DIR, 'batch.zip')
+        self.addCleanup(os.remove, path)
+        call_command('export_resumes_zip', path, '--user', 'testuser', '--format', 'docx', '--processes', '2',
+                     stdout=io.StringIO())
+        with zipfile.ZipFile(path) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(len(archive.namelist()), 3)
+
+
+# Тестування набору бенчмарків на синтетичних даних
+@override_settings(CACHES=TEST_CACHES)
+class BenchmarkSuiteTests(TestCase):
+    def setUp(self):
+        self.corpus = build_corpus(users=2, resumes_per_user=2, templates=4, photo_ratio=0.5, seed=1)
+        for resume in Resume.objects.all():
+            self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(resume.pk)), True)
+
+    def test_corpus(self):
+        """Тест синтетичного набору: кількість резюме, секції різної довжини і фото"""
+        self.assertEqual(self.corpus['resumes'], 4)
+        self.assertEqual(ResumeSection.objects.count(), self.corpus['sections'])
+        self.assertEqual(Resume.objects.exclude(photo='').count(), self.corpus['photos'])
+        lengths = [len(content) for content in ResumeSection.objects.values_list('content', flat=True)]
+        self.assertGreater(max(lengths), 10 * min(lengths))
+
+    def test_photos_depend_only_on_seed(self):
+        """Тест, що однаковий seed дає однакові фото"""
+        self.assertEqual(_photo(random.Random(7)), _photo(random.Random(7)))
+        self.assertNotEqual(_photo(random.Random(7)), _photo(random.Random(8)))
+
+    def test_scenarios(self):
+        """Тест, що кожен сценарій виконує запити без помилок і рахує перцентилі"""
+        for name in SCENARIOS:
+            with self.subTest(name):
+                result = run_scenario(name, requests=6)
+                self.assertEqual(result['errors'], 0)
+                self.assertEqual(result['requests'], 6)
+                self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+                self.assertGreater(result['throughput_rps'], 0)
+
+    def test_compare_results(self):
+        """Тест виявлення регресій при порівнянні запусків"""
+        baseline = {'scenarios': {'export_pdf': {'latency_ms': {'p50': 10.0}, 'throughput_rps': 100.0}}}
+        current = {'scenarios': {'export_pdf': {'latency_ms': {'p50': 12.0}, 'throughput_rps': 95.0}}}
+        rows = {row[1]: row for row in compare_results(baseline, current, threshold=10)}
+        self.assertTrue(rows['latency_ms.p50'][5])  # +20% затримки
+        self.assertFalse(rows['throughput_rps'][5])  # -5% у межах порогу
+
+
+# Тестування middleware профілювання запитів
+@override_settings(CACHES=TEST_CACHES, REQUEST_PROFILING=True, REQUEST_PROFILING_SLOW_MS=0)
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.template = ResumeTemplate.objects.create(name='Шаблон', html_template='<p>{{ resume.title }}</p>')
+        self.resume = Resume.objects.create(user=self.user, title='Резюме', template=self.template)
+        self.addCleanup(shutil.rmtree, os.path.join(settings.EXPORT_CACHE_DIR, str(self.resume.pk)), True)
+        metrics.reset()
+
+    def test_view_metrics_and_slow_log(self):
+        """Тест метрик в'ю і журналу повільного запиту зі списком SQL"""
+        with self.assertLogs('core.profiling', 'WARNING') as logs:
+            response = self.client.get(reverse('resume_preview', kwargs={'pk': self.resume.pk}))
+        self.assertEqual(response.status_code, 200)
+        data = metrics.snapshot()
+        self.assertEqual(data['timings']['views.resume_preview']['count'], 1)
+        self.assertIn('templates.render', data['timings'])
+        self.assertGreater(data['counters']['views.resume_preview.queries'], 0)
+        self.assertIn('preview.render=', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    def test_export_render_time(self):
+        """Тест, що час побудови експорту потрапляє в журнал запиту"""
+        with self.assertLogs('core.profiling', 'WARNING') as logs:
+            response = self.client.get(reverse('export_docx', kwargs={'pk': self.resume.pk}))
+            response.close()
+        self.assertIn('exports.render.docx=', logs.output[0])
+
+    def test_sampled_profile(self):
+        """Тест запису cProfile для вибраних URL"""
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir, True)
+        with self.settings(REQUEST_PROFILING_PROFILE_PATHS=[r'^/templates/ajax/'], REQUEST_PROFILING_SAMPLE_RATE=1,
+                           REQUEST_PROFILING_PROFILE_DIR=profile_dir, REQUEST_PROFILING_SLOW_MS=60000):
+            client = Client()
+            client.get(reverse('template_ajax'))
+            client.get(reverse('templates'))
+        files = os.listdir(profile_dir)
+        self.assertEqual(len(files), 1)
+        self.assertIn('template_ajax', files[0])
+        self.assertIn('gallery_page', str(pstats.Stats(os.path.join(profile_dir, files[0])).stats))
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_disabled(self):
+        """Тест, що без налаштування middleware не працює"""
+        self.client.get(reverse('resume_preview', kwargs={'pk': self.resume.pk}))
+        self.assertNotIn('views.resume_preview', metrics.snapshot()['timings'])
+
 # python manage.py test
\ No newline at end of file
@@ -12,15 +12,21 @@ urlpatterns = [
     path('resume/<int:pk>/edit/', views.ResumeUpdateView.as_view(), name='resume_edit'),
     path('resume/<int:pk>/delete/', views.ResumeDeleteView.as_view(), name='resume_delete'),
     path('resume/<int:pk>/clone/', views.ResumeCloneView.as_view(), name='resume_clone'),
+    path('resumes/clone/', views.resume_bulk_clone, name='resume_bulk_clone'),
     path('resume/<int:pk>/preview/', views.ResumePreviewView.as_view(), name='resume_preview'),
     path('resume/<int:pk>/export/pdf/', views.export_pdf, name='export_pdf'),
     path('resume/<int:pk>/export/docx/', views.export_docx, name='export_docx'),
+    path('resumes/export/zip/', views.export_zip, name='export_zip'),
+    path('export-jobs/<int:pk>/', views.export_job_status, name='export_job_status'),
+    path('export-jobs/<int:pk>/download/', views.export_job_download, name='export_job_download'),
     path('templates/', views.TemplateListView.as_view(), name='templates'),
     path('templates/ajax/', views.template_ajax, name='template_ajax'),
     path('announcements/', views.AnnouncementListView.as_view(), name='announcements'),
     path('announcement/create/', views.AnnouncementCreateView.as_view(), name='announcement_create'),
     path('announcement/<int:pk>/edit/', views.AnnouncementUpdateView.as_view(), name='announcement_edit'),
     path('announcement/<int:pk>/delete/', views.AnnouncementDeleteView.as_view(), name='announcement_delete'),
+    path('internal/metrics/', views.metrics_view, name='metrics'),
+    path('internal/db-connections/', views.db_connections_view, name='db_connections'),
     # drf
     path('api/profiles/', views.ProfileListAPI.as_view(),name='profiles-list-api'),
     path('api/profile/<int:pk>', views.ProfileDetailAPI.as_view(),name='profile-detail-api'),
@@ -29,6 +35,7 @@ urlpatterns = [
     path('api/resumes/', views.ResumeListAPI.as_view(),name='resumes-list-api'),
     path('api/resume/<int:pk>', views.ResumeDetailAPI.as_view(),name='resume-detail-api'),
     path('api/resume-sections/', views.ResumeSectionListAPI.as_view(),name='resume-sections-list-api'),
+    path('api/resume/<int:pk>/sections/', views.ResumeSectionBulkAPI.as_view(), name='resume-sections-bulk-api'),
     path('api/resume-section/<int:pk>', views.ResumeSectionDetailAPI.as_view(),name='resume-section-detail-api'),
     path('api/announcements/', views.AnnouncementListAPI.as_view(),name='announcements-list-api'),
     path('api/announcement/<int:pk>', views.AnnouncementDetailAPI.as_view(),name='announcement-detail-api'),
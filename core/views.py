@@ -1,30 +1,42 @@
 from django.views.generic import TemplateView, FormView, CreateView, UpdateView, DeleteView, ListView, DetailView
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.http import condition, require_POST
+from django.utils.decorators import method_decorator
 from django.contrib.auth.models import User, Group
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponseNotModified, FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
 from django.contrib import messages
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from .forms import RegistrationForm, ResumeForm, get_section_formset
-from .models import Resume, ResumeTemplate, ResumeSection, Announcement, Profile
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import Paragraph
-from reportlab.lib.styles import ParagraphStyle
-from docx import Document
-from docx.shared import Cm
-import io
+from .models import Resume, ResumeTemplate, ResumeSection, Announcement, Profile, ExportJob
+from .exports import EXPORT_FORMATS, render_export
+from .export_cache import export_fingerprint, get_export_cache
+from .jobs import enqueue_export, schedule_prerender
+from .batch_exports import batch_queryset, web_archive
+from .cloning import BULK_CLONE_MAX, clone_resumes
+from .template_cache import compiled_templates
+from .preview_cache import render_preview
+from .conditional import (
+    resume_etag, resume_last_modified, resume_preview_etag,
+    template_gallery_etag, template_list_etag,
+)
+from .template_gallery import InvalidCursor, gallery_page, page_size_from
+from . import metrics
+from .db import connection_stats
 from django.contrib.auth import login
-from django.template import engines
-import os
+import json
 from django.conf import settings
-from django.core.paginator import Paginator
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.core.exceptions import ValidationError as DjangoValidationError
 from .serializers import *
 
 
@@ -34,31 +46,19 @@ class HomeView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['templates'] = ResumeTemplate.objects.all()[:2]  # Популярні шаблони
+        context['templates'] = ResumeTemplate.objects.summary()[:2]  # Популярні шаблони
         context['announcements'] = Announcement.objects.filter(is_active=True).order_by('-created_at')[:5]
         return context
 
 
-# AJAX-view для пагінації шаблонів
+# AJAX-view для галереї шаблонів: ?cursor= з next_cursor попередньої сторінки, ?page_size=
+@condition(etag_func=template_gallery_etag)
 def template_ajax(request):
-    templates = ResumeTemplate.objects.all().order_by('-created_at')  # Сортуємо за датою створення
-    page_number = request.GET.get('page', 1)
-    paginator = Paginator(templates, 2)  # 3 шаблони на сторінку
-    page_obj = paginator.get_page(page_number)
-    data = [{
-        'id': template.id,
-        'name': template.name,
-        'description': template.description,
-        'image': template.image.url if template.image else None
-    } for template in page_obj]
-    return JsonResponse({
-        'templates': data,
-        'has_previous': page_obj.has_previous(),
-        'has_next': page_obj.has_next(),
-        'previous_page': page_obj.previous_page_number() if page_obj.has_previous() else None,
-        'next_page': page_obj.next_page_number() if page_obj.has_next() else None,
-        'num_pages': paginator.num_pages,
-    })
+    try:
+        payload = gallery_page(request.GET.get('cursor'), page_size_from(request.GET.get('page_size')))
+    except InvalidCursor:
+        return JsonResponse({'error': 'Некоректний курсор'}, status=400)
+    return JsonResponse(payload)
 
 
 # В'ю для реєстрації нового користувача
@@ -109,7 +109,11 @@ class ResumeListView(LoginRequiredMixin, ListView):
     context_object_name = 'resumes'
 
     def get_queryset(self):
-        return Resume.objects.filter(user=self.request.user).order_by('-updated_at')
+        return (
+            Resume.objects.filter(user=self.request.user)
+            .select_related('template').defer('template__html_template')
+            .order_by('-updated_at')
+        )
 
 
 # В'ю для створення нового резюме користувача
@@ -141,6 +145,8 @@ class ResumeCreateView(LoginRequiredMixin, CreateView):
         )
         if section_formset.is_valid():
             section_formset.save()
+            if settings.EXPORT_PRERENDER_ON_SAVE:
+                schedule_prerender(self.object)
             messages.success(self.request, "Резюме створено!")
             return super().form_valid(form)
         else:
@@ -171,20 +177,23 @@ class ResumeUpdateView(LoginRequiredMixin, UpdateView):
         return context
 
     def form_valid(self, form):
-        self.object = form.save()
         section_formset = get_section_formset(
             resume=self.object,
             data=self.request.POST,
             files=self.request.FILES
         )
         if section_formset.is_valid():
-            # Перевірка унікальності порядку
-            orders = [f.cleaned_data.get('order') for f in section_formset if f.cleaned_data.get('order') is not None]
-            if len(orders) != len(set(orders)):
+            # Унікальність порядку гарантує UniqueConstraint(resume, order), що перевіряється при COMMIT;
+            # резюме зберігається в тій самій транзакції, щоб помилка секцій відкотила і його зміни
+            try:
+                with transaction.atomic():
+                    self.object = form.save()
+                    section_formset.save()
+            except IntegrityError:
                 messages.error(self.request, "Порядок секцій має бути унікальним.")
                 return self.form_invalid(form)
-
-            section_formset.save()
+            if settings.EXPORT_PRERENDER_ON_SAVE:
+                schedule_prerender(self.object)
             messages.success(self.request, "Резюме оновлено!")
             return super().form_valid(form)
         else:
@@ -211,52 +220,65 @@ class ResumeCloneView(LoginRequiredMixin, DetailView):
     model = Resume
     template_name = 'resume_list.html'  # Не потрібна окрема сторінка
 
+    def get_queryset(self):
+        return Resume.objects.prefetch_related('sections')
+
     def get(self, request, *args, **kwargs):
         resume = self.get_object()
         if resume.user != self.request.user:
             messages.error(self.request, "Доступ заборонено!")
             return redirect('resumes')
-        new_resume = Resume.objects.create(
-            user=resume.user,
-            title=f"Copy of {resume.title}",
-            template=resume.template,
-            photo=resume.photo
-        )
-        for section in resume.sections.all():
-            ResumeSection.objects.create(
-                resume=new_resume,
-                section_type=section.section_type,
-                content=section.content,
-                order=section.order
-            )
+        clone_resumes([resume])
         messages.success(self.request, "Резюме склоновано!")
         return redirect('resumes')
 
 
+# В'ю для пакетного клонування: {"resumes": [{"id": 1, "title": "Для компанії A"}, ...]}
+@login_required
+@require_POST
+def resume_bulk_clone(request):
+    error = JsonResponse({'error': 'Очікується {"resumes": [{"id": <число>, "title": <рядок або null>}]}'}, status=400)
+    try:
+        items = json.loads(request.body)['resumes']
+        ids = [item['id'] for item in items]
+        titles = [item.get('title') for item in items]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return error
+    # bool - теж int, а int() прийняв би і рядки, і дробові числа
+    if not all(type(pk) is int for pk in ids) or not all(title is None or isinstance(title, str) for title in titles):
+        return error
+    if not ids or len(ids) > BULK_CLONE_MAX:
+        return JsonResponse({'error': f'Кількість копій має бути від 1 до {BULK_CLONE_MAX}'}, status=400)
+
+    sources = Resume.objects.filter(user=request.user, pk__in=set(ids)).prefetch_related('sections').in_bulk()
+    if len(sources) != len(set(ids)):
+        return JsonResponse({'error': 'Резюме не знайдено'}, status=404)
+    clones = clone_resumes([sources[pk] for pk in ids], titles)
+    return JsonResponse({'resumes': [{'id': clone.pk, 'title': clone.title} for clone in clones]}, status=201)
+
+
 # В'ю для прев'ю конкретного резюме
+@method_decorator(condition(etag_func=resume_preview_etag), name='get')
 class ResumePreviewView(LoginRequiredMixin, DetailView):
     model = Resume
     template_name = 'resume_preview.html'
     context_object_name = 'resume'
 
     def get_queryset(self):
-        return Resume.objects.filter(user=self.request.user)
+        return Resume.objects.filter(user=self.request.user).with_related()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        # Секції вже завантажені prefetch_related, шаблон сторінки не робить окремих запитів
+        context['sections'] = sections = list(self.object.sections.all())
         if self.object.template:
-            template_engine = engines['django']
-            template = template_engine.from_string(self.object.template.html_template)
-            context['rendered_template'] = template.render({
-                'resume': self.object,
-                'sections': self.object.sections.all(),
-            })
+            context['rendered_template'] = render_preview(self.object, sections)
         return context
 
 
 # В'ю для списку шаблонів резюме
 class TemplateListView(ListView):
-    model = ResumeTemplate
+    queryset = ResumeTemplate.objects.summary()
     template_name = 'template_list.html'
     context_object_name = 'templates'
 
@@ -325,174 +347,270 @@ class AnnouncementDeleteView(LoginRequiredMixin, DeleteView):
         return super().form_valid(form)
 
 
-# В'ю для експорту конкретного резюме в pdf-форматі
-def export_pdf(request, pk):
-    resume = get_object_or_404(Resume, pk=pk, user=request.user)
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{resume.title}.pdf"'
-    
-    # Створюємо PDF
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4  # Розміри сторінки: 595.27 x 841.89 pt
-    
-    # Налаштування шрифтів
-    font_path = os.path.join(settings.BASE_DIR, 'static', 'fonts', 'DejaVuSans.ttf')
-    font_bold_path = os.path.join(settings.BASE_DIR, 'static', 'fonts', 'DejaVuSans-Bold.ttf')
-    try:
-        pdfmetrics.registerFont(TTFont('DejaVuSans', font_path))
-        pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', font_bold_path))
-        font_name = 'DejaVuSans'
-        font_bold_name = 'DejaVuSans-Bold'
-    except Exception as e:
-        print(f"Error loading font: {e}")
-        font_name = 'Helvetica'
-        font_bold_name = 'Helvetica-Bold'  # Резервний жирний шрифт
-    p.setFont(font_name, 12)
-    
-    # Налаштування стилю для Paragraph
-    para_style = ParagraphStyle(
-        name='Normal',
-        fontName=font_name,
-        fontSize=12,
-        leading=14,  # Міжрядковий інтервал
-        leftIndent=3 * cm,  # Відступ зліва
-        spaceAfter=0.5 * cm,  # Відступ після абзацу
-        allowWidows=1,
-        allowOrphans=1,
-    )
-    
-    # Початкові координати
-    y = height - 2 * cm  # Відступ від верху сторінки
-    
-    # Додаємо фотографію (вгорі)
-    if resume.photo:
+# Спільна логіка експорту: віддає документ з кешу або будує його один раз
+def _export_response(request, pk, fmt):
+    resume = get_object_or_404(Resume.objects.with_related(), pk=pk, user=request.user)
+    sections = list(resume.sections.all())
+    content_type = EXPORT_FORMATS[fmt][0]
+    fingerprint = export_fingerprint(resume, sections, fmt)
+    etag = quote_etag(fingerprint)
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    fp = render_export(resume, fmt, sections, fingerprint)[1]
+    response = FileResponse(fp, as_attachment=True, filename=f"{resume.title}.{fmt}", content_type=content_type)
+    response['ETag'] = etag
+    return response
+
+
+# Пакетний експорт резюме користувача в ZIP: ?format=pdf|docx, ?ids=1,2,3 (без ids - усі резюме)
+@login_required
+def export_zip(request):
+    fmt = request.GET.get('format', 'pdf')
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Формат має бути одним з: {", ".join(sorted(EXPORT_FORMATS))}'}, status=400)
+    ids = None
+    if request.GET.get('ids'):
         try:
-            p.drawImage(resume.photo.path, 2 * cm, y - 5 * cm, width=5 * cm, height=5 * cm, preserveAspectRatio=True)
-            y -= 6 * cm  # Зменшуємо y після фото
-        except Exception as e:
-            print(f"Error rendering image: {e}")
-            p.drawString(2 * cm, y, "Не вдалося завантажити фотографію")
-            y -= 1 * cm
-    
-    # Заголовок резюме
-    p.setFont(font_bold_name, 16)
-    p.drawString(2 * cm, y, resume.title[:100])  # Обмежуємо довжину заголовка
-    y -= 1.5 * cm
-    
-    # Секції резюме
-    for section in resume.sections.all().order_by('order'):
-        # Заголовок секції (жирний шрифт)
-        p.setFont(font_bold_name, 12)
-        section_title = f"{section.get_section_type_display()}:"
-        p.drawString(2 * cm, y, section_title)
-        # Опція підкреслення 
-        # text_width = p.stringWidth(section_title, font_bold_name, 12)
-        # p.line(2 * cm, y - 0.2 * cm, 2 * cm + text_width, y - 0.2 * cm)
-        y -= 0.3 * cm
-        # Вміст секції
-        content = section.content or ""
-        if content:
-            p.setFont(font_name, 12)
-            # Створюємо Paragraph для автоматичного перенесення
-            para = Paragraph(content.replace('\n', '<br/>'), para_style)
-            # Обчислюємо необхідну висоту
-            used_height = para.wrap(width - 4 * cm, y - 2 * cm)[1]
-            if y - used_height < 2 * cm:  # Якщо не вистачає місця, нова сторінка
-                p.showPage()
-                p.setFont(font_bold_name, 12)
-                y = height - 2 * cm
-                p.drawString(2 * cm, y, section_title)
-                # p.line(2 * cm, y - 0.2 * cm, 2 * cm + text_width, y - 0.2 * cm)  # Підкреслення на новій сторінці
-                y -= 0.8 * cm
-            # Малюємо Paragraph
-            para.drawOn(p, 2 * cm, y - used_height)
-            y -= used_height + 0.5 * cm  # Додаємо відступ після секції
-            if y < 2 * cm:  # Нова сторінка, якщо закінчився простір
-                p.showPage()
-                p.setFont(font_name, 12)
-                y = height - 2 * cm
-        y -= 1 * cm  # Додатковий відступ
-    
-    p.showPage()
-    p.save()
+            ids = [int(pk) for pk in request.GET['ids'].split(',')]
+        except ValueError:
+            return JsonResponse({'error': 'ids має бути списком чисел через кому'}, status=400)
+    resumes = list(batch_queryset(user=request.user, ids=ids)[:settings.BATCH_EXPORT_MAX + 1])
+    if not resumes:
+        return JsonResponse({'error': 'Резюме не знайдено'}, status=404)
+    if len(resumes) > settings.BATCH_EXPORT_MAX:
+        return JsonResponse({'error': f'Не більше {settings.BATCH_EXPORT_MAX} резюме в одному архіві'}, status=400)
+    archive = web_archive(resumes, fmt)
+    if archive is None:
+        response = JsonResponse({'error': 'Забагато одночасних експортів, спробуйте пізніше'}, status=503)
+        response['Retry-After'] = '30'
+        return response
+    response = StreamingHttpResponse(archive, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="resumes-{fmt}.zip"'
     return response
 
 
+# Ставить експорт у фонову чергу замість побудови в потоці запиту
+def _enqueue_export(request, pk, fmt):
+    resume = get_object_or_404(Resume, pk=pk, user=request.user)
+    job = enqueue_export(resume, fmt)
+    return JsonResponse(_export_job_data(job), status=202)
+
+
+def _export_job_data(job):
+    data = {
+        'id': job.pk,
+        'resume': job.resume_id,
+        'format': job.format,
+        'status': job.status,
+        'error': job.error or None,
+        'status_url': reverse('export_job_status', kwargs={'pk': job.pk}),
+        'download_url': None,
+    }
+    if job.status == ExportJob.STATUS_DONE:
+        data['download_url'] = reverse('export_job_download', kwargs={'pk': job.pk})
+    return data
+
+
+# В'ю для експорту конкретного резюме в pdf-форматі
+# POST ставить експорт у фонову чергу
+@login_required
+def export_pdf(request, pk):
+    if request.method == 'POST':
+        return _enqueue_export(request, pk, 'pdf')
+    return _export_response(request, pk, 'pdf')
+
+
 # В'ю для експорту конкретного резюме в docx-форматі
+# POST ставить експорт у фонову чергу
+@login_required
 def export_docx(request, pk):
-    resume = get_object_or_404(Resume, pk=pk, user=request.user)
-    doc = Document()
-    
-    # Додаємо фотографію (вгорі)
-    if resume.photo:
-        try:
-            paragraph = doc.add_paragraph()
-            run = paragraph.add_run()
-            run.add_picture(resume.photo.path, width=Cm(5), height=Cm(5))
-            paragraph.paragraph_format.space_after = Cm(0.5)
-        except Exception as e:
-            print(f"Error adding image to DOCX: {e}")
-            doc.add_paragraph(f"Не вдалося завантажити фотографію")
-    
-    # Заголовок резюме
-    doc.add_heading(resume.title[:100], 0)
-    
-    # Секції резюме
-    for section in resume.sections.all().order_by('order'):
-        # Налаштування стилю для жирного заголовка секції
-        heading = doc.add_heading(level=1)
-        run = heading.add_run(f"{section.get_section_type_display()}:")
-        run.bold = True
-        # Опція підкреслення
-        # run.underline = True
-        # Вміст секції
-        doc.add_paragraph(section.content or "")
-    
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-    response['Content-Disposition'] = f'attachment; filename="{resume.title}.docx"'
-    doc_buffer = io.BytesIO()
-    doc.save(doc_buffer)
-    response.write(doc_buffer.getvalue())
+    if request.method == 'POST':
+        return _enqueue_export(request, pk, 'docx')
+    return _export_response(request, pk, 'docx')
+
+
+# В'ю для перевірки статусу фонового експорту
+@login_required
+def export_job_status(request, pk):
+    job = get_object_or_404(ExportJob, pk=pk, resume__user=request.user)
+    return JsonResponse(_export_job_data(job))
+
+
+# В'ю для завантаження результату фонового експорту
+@login_required
+def export_job_download(request, pk):
+    job = get_object_or_404(ExportJob.objects.select_related('resume'), pk=pk, resume__user=request.user)
+    if job.status != ExportJob.STATUS_DONE:
+        return JsonResponse(_export_job_data(job), status=409)
+    # Віддаємо саме той файл, який збудувала задача, без рендерингу в потоці запиту
+    fp = get_export_cache().open(job.resume_id, job.fingerprint, job.format)
+    if fp is None:
+        # Резюме змінилося або файл витіснено з кешу: ставимо новий експорт у чергу
+        return JsonResponse(_export_job_data(enqueue_export(job.resume, job.format)), status=410)
+    response = FileResponse(fp, as_attachment=True, filename=f"{job.resume.title}.{job.format}",
+                            content_type=EXPORT_FORMATS[job.format][0])
+    response['ETag'] = quote_etag(job.fingerprint)
     return response
 
 
+# В'ю з метриками процесу (кеші, час завантаження шрифтів тощо) для персоналу
+@staff_member_required
+def metrics_view(request):
+    data = metrics.snapshot()
+    data['compiled_templates'] = compiled_templates.stats()
+    return JsonResponse(data)
+
+
+# В'ю зі станом з'єднань з БД і пулу psycopg поточного воркера для персоналу
+@staff_member_required
+def db_connections_view(request):
+    return JsonResponse(connection_stats())
+
+
 # --------- В'юшки для API ---------
 # визначають, як дані будуть оброблятись і повертатись у відповідь на HTTP-запити
 
+# Міксин для API-списків: фільтри ?<поле>=значення по індексованих колонках
+# і вибірка з БД лише тих колонок, що запитані через ?fields=
+class ListQueryMixin:
+    filter_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for field in self.filter_fields:
+            value = self.request.query_params.get(field)
+            if value is not None:
+                try:
+                    queryset = queryset.filter(**{field: value})
+                except (ValueError, TypeError, DjangoValidationError):
+                    raise ValidationError({field: f"Некоректне значення: {value}"})
+        fields = requested_fields(self.request)
+        if fields:
+            model_fields = {f.name for f in queryset.model._meta.concrete_fields}
+            queryset = queryset.only(*((fields & model_fields) | {'id'}))
+        return queryset
+
+
 # Показ\додавання профілей
-class ProfileListAPI(generics.ListCreateAPIView):
+class ProfileListAPI(ListQueryMixin, generics.ListCreateAPIView):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
+    filter_fields = ('user',)
 
 # Редагування\видалення профілей
 class ProfileDetailAPI(generics.RetrieveUpdateDestroyAPIView):
     queryset = Profile.objects.all()
     serializer_class = ProfileSerializer
 
-# Показ\додавання шаблонів резюме
-class ResumeTemplateListAPI(generics.ListCreateAPIView):
+# Показ\додавання шаблонів резюме; список віддається без html_template (повний шаблон - у детальному API)
+@method_decorator(condition(etag_func=template_list_etag), name='get')
+class ResumeTemplateListAPI(ListQueryMixin, generics.ListCreateAPIView):
     queryset = ResumeTemplate.objects.all()
     serializer_class = ResumeTemplateSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            return queryset.summary()
+        return queryset
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return ResumeTemplateSummarySerializer
+        return ResumeTemplateSerializer
+
 # Редагування\видалення шаблонів резюме
 class ResumeTemplateDetailAPI(generics.RetrieveUpdateDestroyAPIView):
     queryset = ResumeTemplate.objects.all()
     serializer_class = ResumeTemplateSerializer
 
-# Показ\додавання резюме
-class ResumeListAPI(generics.ListCreateAPIView):
+# Резюме разом із секціями і шаблоном без тексту html_template
+def resumes_with_sections():
+    return Resume.objects.with_related().defer('template__html_template')
+
+
+# Показ\додавання резюме; ?ids=1,2,3 повертає ці резюме повністю, з секціями
+class ResumeListAPI(ListQueryMixin, generics.ListCreateAPIView):
     queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
+    filter_fields = ('user', 'template')
+    max_bulk_ids = 100
+
+    def bulk_ids(self):
+        ids = self.request.query_params.get('ids')
+        if ids is None or self.request.method != 'GET':
+            return None
+        try:
+            ids = [int(pk) for pk in ids.split(',') if pk.strip()]
+        except ValueError:
+            raise ValidationError({'ids': "Очікується список id через кому"})
+        if len(ids) > self.max_bulk_ids:
+            raise ValidationError({'ids': f"Не більше {self.max_bulk_ids} id за запит"})
+        return ids
 
-# Редагування\видалення резюме
+    def get_queryset(self):
+        ids = self.bulk_ids()
+        if ids is not None:
+            return resumes_with_sections().filter(pk__in=ids).order_by('pk')
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.bulk_ids() is not None:
+            return ResumeDetailSerializer
+        return ResumeSerializer
+
+    def paginate_queryset(self, queryset):
+        if self.bulk_ids() is not None:
+            return None
+        return super().paginate_queryset(queryset)
+
+# Редагування\видалення резюме; читання повертає резюме з секціями одним запитом до API
+@method_decorator(condition(etag_func=resume_etag, last_modified_func=resume_last_modified), name='get')
 class ResumeDetailAPI(generics.RetrieveUpdateDestroyAPIView):
     queryset = Resume.objects.all()
     serializer_class = ResumeSerializer
 
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            return resumes_with_sections()
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return ResumeDetailSerializer
+        return ResumeSerializer
+
 # Показ\додавання секції резюме
-class ResumeSectionListAPI(generics.ListCreateAPIView):
+class ResumeSectionListAPI(ListQueryMixin, generics.ListCreateAPIView):
     queryset = ResumeSection.objects.all()
     serializer_class = ResumeSectionSerializer
+    filter_fields = ('resume',)
+
+# Пакетне збереження/перевпорядкування всіх секцій резюме одним запитом (PUT зі списком секцій)
+class ResumeSectionBulkAPI(generics.GenericAPIView):
+    queryset = Resume.objects.all()
+    serializer_class = ResumeSectionBulkSerializer
+    permission_classes = [IsAuthenticated]
+
+    # Запит замінює всі секції резюме, тож змінювати можна лише власні резюме
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user)
+
+    def put(self, request, *args, **kwargs):
+        resume = self.get_object()
+        serializer = self.get_serializer(
+            list(resume.sections.all()),
+            data=request.data,
+            many=True,
+            context={'resume': resume, 'request': request},
+        )
+        serializer.is_valid(raise_exception=True)
+        sections = serializer.save()
+        return Response(ResumeSectionNestedSerializer(sections, many=True).data)
 
 # Редагування\видалення секції резюме
 class ResumeSectionDetailAPI(generics.RetrieveUpdateDestroyAPIView):
@@ -500,9 +618,10 @@ class ResumeSectionDetailAPI(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ResumeSectionSerializer
 
 # Показ\додавання оголошень
-class AnnouncementListAPI(generics.ListCreateAPIView):
+class AnnouncementListAPI(ListQueryMixin, generics.ListCreateAPIView):
     queryset = Announcement.objects.all()
     serializer_class = AnnouncementSerializer
+    filter_fields = ('created_by',)
 
 # Редагування\видалення оголошень
 class AnnouncementDetailAPI(generics.RetrieveUpdateDestroyAPIView):
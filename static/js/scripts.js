@@ -1,9 +1,11 @@
 console.log('scripts.js loaded successfully');
 
-let currentPage = 1;
+// Курсори відкритих сторінок: останній - поточна сторінка, null - перша
+let cursors = [];
+let nextCursor = null;
 
-function loadTemplates(page) {
-    console.log('loadTemplates called with page:', page);
+function loadTemplates(cursor) {
+    console.log('loadTemplates called with cursor:', cursor);
     const templateList = document.getElementById('template-list');
     if (!templateList) {
         console.error('Element #template-list not found');
@@ -17,8 +19,9 @@ function loadTemplates(page) {
         return;
     }
 
-    console.log('Fetching templates from:', window.TEMPLATE_AJAX_URL + '?page=' + page);
-    fetch(window.TEMPLATE_AJAX_URL + '?page=' + page)
+    const url = window.TEMPLATE_AJAX_URL + (cursor ? '?cursor=' + encodeURIComponent(cursor) : '');
+    console.log('Fetching templates from:', url);
+    fetch(url)
         .then(response => {
             console.log('Fetch response status:', response.status);
             if (!response.ok) {
@@ -56,15 +59,19 @@ function loadTemplates(page) {
 
             const prevPage = document.getElementById('prev-page');
             const nextPage = document.getElementById('next-page');
+            if (cursors[cursors.length - 1] !== cursor) {
+                cursors.push(cursor);
+            }
+            nextCursor = data.next_cursor;
+            const hasPrevious = cursors.length > 1;
             if (prevPage && nextPage) {
-                prevPage.disabled = !data.has_previous;
-                prevPage.href = data.has_previous ? '#' : '';
+                prevPage.disabled = !hasPrevious;
+                prevPage.href = hasPrevious ? '#' : '';
                 nextPage.disabled = !data.has_next;
                 nextPage.href = data.has_next ? '#' : '';
             } else {
                 console.error('Pagination buttons not found');
             }
-            currentPage = page;
         })
         .catch(error => {
             console.error('Error loading templates:', error);
@@ -79,7 +86,7 @@ document.addEventListener('DOMContentLoaded', () => {
         document.getElementById('template-list').innerHTML = '<p>Помилка: URL для AJAX не визначено.</p>';
         return;
     }
-    loadTemplates(1);
+    loadTemplates(null);
 
     const prevPage = document.getElementById('prev-page');
     const nextPage = document.getElementById('next-page');
@@ -92,7 +99,8 @@ document.addEventListener('DOMContentLoaded', () => {
         e.preventDefault();
         if (!this.disabled) {
             console.log('Previous page clicked');
-            loadTemplates(currentPage - 1);
+            cursors.pop();
+            loadTemplates(cursors[cursors.length - 1]);
         }
     });
 
@@ -100,7 +108,7 @@ document.addEventListener('DOMContentLoaded', () => {
         e.preventDefault();
         if (!this.disabled) {
             console.log('Next page clicked');
-            loadTemplates(currentPage + 1);
+            loadTemplates(nextCursor);
         }
     });
 });
\ No newline at end of file